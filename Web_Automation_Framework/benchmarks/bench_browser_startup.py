@@ -0,0 +1,225 @@
+"""
+Browser startup and teardown times for the local browsers DriverEngine launches.
+
+For every browser and launch profile, each run measures:
+
+    cold_launch       get_local_driver() with no driver service running
+    first_navigation  driver.get() of a page served locally
+    teardown          driver.quit()
+    warm_launch       get_local_driver() against the running driver service
+    initialize_driver initialize_driver() as a scenario calls it (pooled session,
+                      next one pre-warmed in the background, navigation included)
+    checkin           checkin_driver() resetting the pooled session
+
+and reports mean/p50/p90/p95/max over the runs. Results (with browser, driver and
+Selenium versions) are written as JSON; with a baseline file, any p50 or p95 that
+is more than --threshold slower than the baseline (and at least --min-delta-ms)
+is a regression and the exit code is 1.
+
+    python -m benchmarks.bench_browser_startup --browser chrome firefox --runs 10
+    python -m benchmarks.bench_browser_startup --update-baseline
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import selenium
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.DriverEngine import DriverEngine, shutdown_driver_pools  # noqa: E402
+from utilities.LaunchProfiles import LAUNCH_PROFILES  # noqa: E402
+
+PHASES = ["cold_launch", "first_navigation", "teardown", "warm_launch", "initialize_driver", "checkin"]
+COMPARED = ["p50", "p95"]
+DEFAULT_OUTPUT = os.path.join("reports", "benchmarks", "browser_startup.json")
+DEFAULT_BASELINE = os.path.join("benchmarks", "baselines", "browser_startup.json")
+
+PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Startup</title>
+<link rel="stylesheet" href="/style.css"></head>
+<body><h1 id="title">Startup benchmark</h1>
+<form><input id="name" name="name"><button id="submit" type="button">Go</button></form>
+<script src="/app.js"></script>
+</body></html>
+"""
+
+
+def write_site(folder: str) -> None:
+    with open(os.path.join(folder, "index.html"), "w", encoding="utf-8") as fh:
+        fh.write(PAGE)
+    with open(os.path.join(folder, "style.css"), "w", encoding="utf-8") as fh:
+        fh.write("body { font-family: sans-serif; }\n" * 200)
+    with open(os.path.join(folder, "app.js"), "w", encoding="utf-8") as fh:
+        fh.write("document.getElementById('submit').onclick = () => {};\n" * 200)
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples) -> dict:
+    return {
+        "runs": len(samples),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 1),
+        "p50_ms": round(percentile(samples, 50) * 1000, 1),
+        "p90_ms": round(percentile(samples, 90) * 1000, 1),
+        "p95_ms": round(percentile(samples, 95) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+def timed(samples: list, fn):
+    started = time.perf_counter()
+    result = fn()
+    samples.append(time.perf_counter() - started)
+    return result
+
+
+def versions(driver) -> dict:
+    capabilities = driver.capabilities
+    return {
+        "browser_version": capabilities.get("browserVersion"),
+        "driver_version": (capabilities.get("chrome", {}).get("chromedriverVersion", "").split(" ")[0]
+                           or capabilities.get("moz:geckodriverVersion")),
+    }
+
+
+def measure(browser: str, profile: str, runs: int, headless: bool, url: str) -> dict:
+    engine = DriverEngine()
+    engine.browser_name = browser
+    engine.headless_browser = "true" if headless else "false"
+    engine.launch_profile = profile
+    samples = {phase: [] for phase in PHASES}
+    info = {}
+
+    for _ in range(runs):
+        # cold: no driver service and no pooled browser left from the previous run
+        shutdown_driver_pools()
+        driver = timed(samples["cold_launch"], engine.get_local_driver)
+        info = info or versions(driver)
+        timed(samples["first_navigation"], lambda: driver.get(url))
+        timed(samples["teardown"], driver.quit)
+        driver = timed(samples["warm_launch"], engine.get_local_driver)
+        driver.quit()
+
+    engine.web_app_url = url
+    engine.platform_name = "local"
+    for _ in range(runs):
+        timed(samples["initialize_driver"], engine.initialize_driver)
+        timed(samples["checkin"], engine.checkin_driver)
+    shutdown_driver_pools()
+
+    return dict(info, phases={phase: summarize(values) for phase, values in samples.items() if values})
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta_ms: float) -> list:
+    regressions = []
+    for key, current in results["browsers"].items():
+        previous = baseline.get("browsers", {}).get(key)
+        if previous is None:
+            continue
+        for phase, stats in current["phases"].items():
+            before = previous["phases"].get(phase)
+            if before is None:
+                continue
+            for metric in COMPARED:
+                now, then = stats[f"{metric}_ms"], before[f"{metric}_ms"]
+                if now - then >= min_delta_ms and now > then * (1 + threshold):
+                    regressions.append(f"{key} {phase} {metric}: {then:.1f}ms -> {now:.1f}ms "
+                                       f"(+{(now / then - 1) * 100:.0f}%)")
+    return regressions
+
+
+def write_json(path: str, data: dict) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--browser", nargs="+", default=["chrome", "firefox"],
+                        choices=["chrome", "firefox", "safari"])
+    parser.add_argument("--profile", nargs="+", default=["default"], choices=list(LAUNCH_PROFILES))
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, 0.2 = 20%%")
+    parser.add_argument("--min-delta-ms", type=float, default=50.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "selenium": selenium.__version__,
+        "headless": not args.headed,
+        "browsers": {},
+    }
+    with tempfile.TemporaryDirectory() as folder:
+        write_site(folder)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=folder))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/index.html"
+        try:
+            for browser in args.browser:
+                for profile in args.profile:
+                    results["browsers"][f"{browser}/{profile}"] = measure(browser, profile, args.runs,
+                                                                          not args.headed, url)
+        finally:
+            server.shutdown()
+
+    print(f"\n{args.runs} runs, selenium {results['selenium']}, {results['platform']}")
+    for key, result in results["browsers"].items():
+        print(f"\n{key} (browser {result.get('browser_version')}, driver {result.get('driver_version')})")
+        print(f"{'phase':<20}{'mean':>10}{'p50':>10}{'p90':>10}{'p95':>10}{'max':>10}   ms")
+        for phase, stats in result["phases"].items():
+            print(f"{phase:<20}{stats['mean_ms']:>10.1f}{stats['p50_ms']:>10.1f}{stats['p90_ms']:>10.1f}"
+                  f"{stats['p95_ms']:>10.1f}{stats['max_ms']:>10.1f}")
+
+    write_json(args.output, results)
+    print(f"\nResults written to {args.output}")
+    if args.update_baseline:
+        write_json(args.baseline, results)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    if baseline.get("selenium") != results["selenium"]:
+        print(f"Note: baseline was taken with selenium {baseline.get('selenium')}")
+    regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline} (taken {baseline.get('created')}):")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"No regressions against {args.baseline} (threshold {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Remote-session overhead with plain webdriver.Remote against the pooled GridClient.
+
+Starts a stub W3C endpoint (or uses --hub, e.g. a local Selenium standalone) and
+runs the same sessions through both: each session opens, sends --commands
+navigation/title commands and quits, --threads at a time. Reports wall time,
+TCP connections accepted by the stub, failed sessions and per-command latency.
+--handshake-ms delays every new stub connection like a TCP+TLS handshake to a
+remote hub would; --capacity makes the stub refuse sessions beyond that many, to
+exercise queueing and retries.
+
+    python -m benchmarks.bench_grid_connection --sessions 20 --threads 4 --commands 50
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.GridConnection import GridClient  # noqa: E402
+
+
+class StubGrid(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, capacity: int, latency: float, handshake: float):
+        super().__init__(("127.0.0.1", 0), StubGridHandler)
+        self.capacity = capacity
+        self.latency = latency
+        self.handshake = handshake
+        self.connections = 0
+        self.sessions = set()
+        self.lock = threading.Lock()
+
+
+class StubGridHandler(BaseHTTPRequestHandler):
+    """
+    Just enough of the W3C protocol for session create/quit and simple commands.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.lock:
+            self.server.connections += 1
+        time.sleep(self.server.handshake)
+
+    def _reply(self, status: int, value) -> None:
+        body = json.dumps({"value": value}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _dispatch(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        time.sleep(self.server.latency)
+        parts = [p for p in self.path.split("/") if p]
+        if parts == ["status"]:
+            self._reply(200, {"ready": len(self.server.sessions) < self.server.capacity, "message": "stub"})
+        elif parts == ["session"] and self.command == "POST":
+            with self.server.lock:
+                if len(self.server.sessions) >= self.server.capacity:
+                    self._reply(500, {"error": "session not created", "message": "No free slots", "stacktrace": ""})
+                    return
+                session_id = uuid.uuid4().hex
+                self.server.sessions.add(session_id)
+            self._reply(200, {"sessionId": session_id, "capabilities": {"browserName": "chrome"}})
+        elif len(parts) == 2 and self.command == "DELETE":
+            with self.server.lock:
+                self.server.sessions.discard(parts[1])
+            self._reply(200, None)
+        elif parts[-1] == "url" and self.command == "GET":
+            self._reply(200, "about:blank")
+        elif parts[-1] == "title":
+            self._reply(200, "Stub")
+        else:
+            self._reply(200, None)
+
+    do_GET = do_POST = do_DELETE = _dispatch
+
+    def log_message(self, *args):
+        pass
+
+
+def run_session(make_driver, commands: int) -> bool:
+    try:
+        driver = make_driver()
+    except Exception:
+        return False
+    try:
+        for i in range(commands):
+            if i % 2:
+                driver.get("about:blank")
+            else:
+                assert driver.title is not None
+    finally:
+        driver.quit()
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hub", help="existing hub URL; default: start the stub")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--commands", type=int, default=50)
+    parser.add_argument("--capacity", type=int, default=100, help="stub: concurrent sessions before refusing")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="stub: per-request server time")
+    parser.add_argument("--handshake-ms", type=float, default=30.0, help="stub: delay per new connection")
+    args = parser.parse_args()
+
+    stub = None
+    hub = args.hub
+    if hub is None:
+        stub = StubGrid(args.capacity, args.latency_ms / 1000, args.handshake_ms / 1000)
+        threading.Thread(target=stub.serve_forever, daemon=True).start()
+        hub = f"http://127.0.0.1:{stub.server_port}"
+
+    def options():
+        opts = Options()
+        opts.add_argument("--headless")
+        return opts
+
+    client = GridClient(hub, max_sessions=args.threads, backoff_seconds=0.2)
+    variants = {
+        "webdriver.Remote": lambda: webdriver.Remote(command_executor=hub, options=options()),
+        "GridClient": lambda: client.new_session(options()),
+    }
+    print(f"\n{args.sessions} sessions x {args.commands} commands, {args.threads} threads, hub {hub}")
+    print(f"{'executor':<18}{'wall (s)':>10}{'connections':>13}{'failed':>8}{'per command (ms)':>18}")
+    for name, make_driver in variants.items():
+        before = stub.connections if stub else 0
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            futures = [pool.submit(run_session, make_driver, args.commands) for _ in range(args.sessions)]
+            failed = sum(not future.result() for future in futures)
+        elapsed = time.perf_counter() - started
+        connections = (stub.connections - before) if stub else "n/a"
+        per_command = elapsed / (args.sessions * (args.commands + 2)) * 1000
+        print(f"{name:<18}{elapsed:>10.3f}{connections:>13}{failed:>8}{per_command:>18.3f}")
+
+    stats = client.stats()
+    print(f"\nGridClient: {stats['sessions_created']} sessions, {stats['session_retries']} retries, "
+          f"{stats['queued_seconds']}s queued")
+    for command, metrics in sorted(stats["commands"].items()):
+        print(f"  {command:<24}{metrics}")
+    client.close()
+    if stub:
+        stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
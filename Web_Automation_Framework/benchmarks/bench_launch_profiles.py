@@ -0,0 +1,123 @@
+"""
+Per-scenario wall time of the "fast" launch profile against the default profile.
+
+Serves a local test site (pages with images, web fonts and a slow subresource
+delay) and runs the same scenario for each profile: launch the browser, walk
+through the pages, read a field, quit.
+
+    python -m benchmarks.bench_launch_profiles --browser chrome --scenarios 10
+"""
+import argparse
+import functools
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from selenium.webdriver.common.by import By
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.DriverEngine import DriverEngine  # noqa: E402
+from utilities.LaunchProfiles import LAUNCH_PROFILES  # noqa: E402
+
+PAGES = 3
+IMAGES_PER_PAGE = 20
+SUBRESOURCE_DELAY_SECONDS = 0.05
+
+PAGE_TEMPLATE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Page {page}</title>
+<style>
+@font-face {{ font-family: "Bench"; src: url("/font-{page}.woff2") format("woff2"); }}
+body {{ font-family: "Bench", sans-serif; }}
+</style></head>
+<body>
+<h1 id="title">Page {page}</h1>
+{images}
+<a id="next" href="{next_href}">next</a>
+</body></html>
+"""
+
+
+def write_site(folder: str) -> None:
+    png = bytes.fromhex(
+        "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+        "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082")
+    for page in range(PAGES):
+        images = "\n".join(f'<img src="/img-{page}-{i}.png" width="64" height="64">' for i in range(IMAGES_PER_PAGE))
+        next_href = f"/page-{page + 1}.html" if page + 1 < PAGES else "/page-0.html"
+        with open(os.path.join(folder, f"page-{page}.html"), "w", encoding="utf-8") as fh:
+            fh.write(PAGE_TEMPLATE.format(page=page, images=images, next_href=next_href))
+        with open(os.path.join(folder, f"font-{page}.woff2"), "wb") as fh:
+            fh.write(os.urandom(64 * 1024))
+        for i in range(IMAGES_PER_PAGE):
+            with open(os.path.join(folder, f"img-{page}-{i}.png"), "wb") as fh:
+                fh.write(png)
+
+
+class SlowSubresourceHandler(SimpleHTTPRequestHandler):
+    """
+    Delays everything but the HTML, like images and fonts coming from a CDN.
+    """
+
+    def do_GET(self):
+        if not self.path.endswith(".html"):
+            time.sleep(SUBRESOURCE_DELAY_SECONDS)
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+def run_scenario(engine: DriverEngine, base_url: str) -> float:
+    started = time.perf_counter()
+    driver = engine.get_local_driver()
+    try:
+        driver.get(f"{base_url}/page-0.html")
+        for _ in range(PAGES - 1):
+            driver.find_element(By.ID, "next").click()
+        assert driver.find_element(By.ID, "title").text
+    finally:
+        driver.quit()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--browser", default="chrome", choices=["chrome", "firefox"])
+    parser.add_argument("--scenarios", type=int, default=10)
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        write_site(folder)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(SlowSubresourceHandler, directory=folder))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+        results = {}
+        try:
+            for profile in LAUNCH_PROFILES:
+                engine = DriverEngine()
+                engine.browser_name = args.browser
+                engine.headless_browser = "false" if args.headed else "true"
+                engine.launch_profile = profile
+                run_scenario(engine, base_url)  # warm-up: driver binaries, seeded profile
+                results[profile] = [run_scenario(engine, base_url) for _ in range(args.scenarios)]
+        finally:
+            server.shutdown()
+
+    baseline = statistics.median(results["default"])
+    print(f"\n{args.browser}, {args.scenarios} scenarios per profile, {PAGES} pages each")
+    print(f"{'profile':<10}{'median (s)':>12}{'mean (s)':>12}{'max (s)':>12}{'speedup':>10}")
+    for profile, samples in results.items():
+        median = statistics.median(samples)
+        print(f"{profile:<10}{median:>12.3f}{statistics.mean(samples):>12.3f}{max(samples):>12.3f}"
+              f"{baseline / median:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Load-time comparison of the test-data backends behind ExcelReader.
+
+Writes one synthetic sheet in every supported format and times a full-sheet read
+(get_data_by_name) and a single-field lookup (get_data_as_string) for each.
+
+    python -m benchmarks.bench_testdata_backends --rows 20000 --repeat 5
+"""
+import argparse
+import csv
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.ExcelReader import ExcelReader, workbook_cache  # noqa: E402
+
+SHEET = "Data"
+HEADERS = ["ScenarioName", "Name", "Email", "Phone", "Address", "City", "Zip", "Text"]
+
+
+def make_rows(count: int):
+    for i in range(count):
+        yield [f"Scenario {i}", f"User {i}", f"user{i}@example.com", f"555{i:07d}",
+               f"{i} Main Street", "Atlanta", f"{30000 + i % 1000}", "lorem ipsum " * 4]
+
+
+def write_books(folder: str, rows: int) -> dict:
+    books = {}
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = SHEET
+    ws.append(HEADERS)
+    for row in make_rows(rows):
+        ws.append(row)
+    books["xlsx"] = os.path.join(folder, "book.xlsx")
+    wb.save(books["xlsx"])
+
+    books["csv"] = os.path.join(folder, "book.csv")
+    os.makedirs(books["csv"])
+    with open(os.path.join(books["csv"], f"{SHEET}.csv"), "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(HEADERS)
+        writer.writerows(make_rows(rows))
+
+    books["jsonl"] = os.path.join(folder, "book.jsonl")
+    os.makedirs(books["jsonl"])
+    with open(os.path.join(books["jsonl"], f"{SHEET}.jsonl"), "w", encoding="utf-8") as fh:
+        for row in make_rows(rows):
+            fh.write(json.dumps(dict(zip(HEADERS, row))) + "\n")
+
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("pyarrow not installed: skipping parquet and arrow")
+        return books
+
+    table = pa.table({header: column for header, column in zip(HEADERS, zip(*make_rows(rows)))})
+    books["parquet"] = os.path.join(folder, "book.parquet")
+    os.makedirs(books["parquet"])
+    pq.write_table(table, os.path.join(books["parquet"], f"{SHEET}.parquet"))
+    books["arrow"] = os.path.join(folder, "book.arrow")
+    os.makedirs(books["arrow"])
+    feather.write_feather(table, os.path.join(books["arrow"], f"{SHEET}.arrow"))
+    return books
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        workbook_cache.clear()
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    reader = ExcelReader()
+    with tempfile.TemporaryDirectory() as folder:
+        books = write_books(folder, args.rows)
+
+        results = []
+        for name, path in books.items():
+            variants = [(name, True)]
+            if name == "xlsx":
+                # raw openpyxl as well as the compiled sidecar (compiled by the first run)
+                variants = [("xlsx (openpyxl)", False), ("xlsx (sidecar)", True)]
+            for label, use_sidecar in variants:
+                reader.use_sidecar = use_sidecar
+                full = timed(lambda: reader.get_data_by_name(path, SHEET), args.repeat)
+                field = timed(lambda: reader.get_data_as_string(path, 0, "Email"), args.repeat)
+                results.append((label, full, field))
+        reader.use_sidecar = True
+
+    baseline = results[0][1]
+    print(f"\n{args.rows} rows x {len(HEADERS)} columns, median of {args.repeat} runs")
+    print(f"{'backend':<18}{'full sheet (s)':>16}{'speedup':>10}{'one field (s)':>16}")
+    for label, full, field in results:
+        print(f"{label:<18}{full:>16.4f}{baseline / full:>9.1f}x{field:>16.4f}")
+
+
+if __name__ == "__main__":
+    main()
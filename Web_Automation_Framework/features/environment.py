@@ -0,0 +1,62 @@
+import logging
+
+from utilities.AccountClaimService import sync_all_claims
+from utilities.CompoundActions import log_action_stats
+from utilities.DriverEngine import DriverEngine, shutdown_driver_pools
+from utilities.ExcelReader import excel_write_buffer, test_data_prefetcher
+from utilities.GridConnection import shutdown_grid_clients
+from utilities.LaunchProfiles import normalize_profile
+from utilities.NetworkPolicy import save_network_sizes
+from utilities.WaitEngine import log_wait_stats
+
+logger = logging.getLogger(__name__)
+
+
+def before_all(context):
+    DriverEngine.network_policy_path = context.config.userdata.get("network_policy")
+    DriverEngine.replay_mode = context.config.userdata.get("replay_mode")
+    DriverEngine.replay_rules_path = context.config.userdata.get("replay_rules")
+    DriverEngine.wait_mode = context.config.userdata.get("wait_mode")
+    DriverEngine.compound_actions = context.config.userdata.getbool("compound_actions", True)
+    DriverEngine.launch_profile = normalize_profile(context.config.userdata.get("launch_profile"))
+    # load every sheet named in the Examples tables while the first browser starts
+    test_data_path = context.config.userdata.get("test_data_path")
+    if test_data_path:
+        sheet_names = test_data_prefetcher.collect_sheet_names(context._runner.features)
+        test_data_prefetcher.start(test_data_path, sheet_names)
+
+
+def before_scenario(context, scenario):
+    # per-thread name, picked up by remote sessions
+    setattr(DriverEngine.tl_scenario_name, 'name', scenario.name)
+    setattr(DriverEngine.tl_scenario_name, 'feature', scenario.feature.name)
+
+
+def after_scenario(context, scenario):
+    # a scenario that stopped before "close the driver" still returns its session;
+    # failed sessions are quit rather than reused
+    driver_engine = getattr(context, "driver_engine", None)
+    network_policy = getattr(getattr(context, "driver", None), "network_policy", None)
+    if network_policy is not None:
+        logger.info("Network traffic for '%s': %s", scenario.name, network_policy.scenario_stats())
+    pages = getattr(context, "pages", None)
+    if pages is not None:
+        logger.info("Element cache for '%s': %s", scenario.name, pages.element_cache_stats())
+        pages.close()
+    if driver_engine is not None:
+        driver_engine.checkin_driver(context.driver, failed=scenario.status == "failed")
+    # queue the flags of accounts claimed during the scenario
+    sync_all_claims()
+    # save the scenario's buffered result writes in one load/save per workbook
+    excel_write_buffer.flush()
+
+
+def after_all(context):
+    sync_all_claims()
+    excel_write_buffer.flush()
+    test_data_prefetcher.shutdown()
+    save_network_sizes()
+    log_wait_stats()
+    log_action_stats()
+    shutdown_driver_pools()
+    shutdown_grid_clients()
@@ -3,9 +3,7 @@ Feature: summa
   Scenario Outline: test
     Given the URL is opened
     Then Click gender
-    Then Enter your full name "<SheetName>"
-    Then Enter your Email "<SheetName>"
-    Then Enter your phonenumber "<SheetName>"
+    Then Enter your contact details "<SheetName>"
     Then Scroll until visible and enter name in section 1
     Then close the driver
 
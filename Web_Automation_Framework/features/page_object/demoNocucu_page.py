@@ -1,27 +1,11 @@
 from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webdriver import WebDriver
 
-class demoNocucu_page:
+from utilities.PageElements import BasePage, Locator
 
-    def __init__(self, driver: WebDriver):
-        self.driver = driver
+class demoNocucu_page(BasePage):
 
-    @property
-    def input_name(self):
-        return self.driver.find_element(By.ID, "name")
-
-    @property
-    def input_email(self):
-        return self.driver.find_element(By.ID, "email")
-
-    @property
-    def input_phone(self):
-        return self.driver.find_element(By.ID, "phone")
-
-    @property
-    def input_misc(self):
-        return self.driver.find_element(By.ID, "input1")
-
-    @property
-    def gender_male(self):
-        return self.driver.find_element(By.ID, "male")
\ No newline at end of file
+    input_name = Locator(By.ID, "name")
+    input_email = Locator(By.ID, "email")
+    input_phone = Locator(By.ID, "phone")
+    input_misc = Locator(By.ID, "input1")
+    gender_male = Locator(By.ID, "male")
@@ -23,12 +23,20 @@ from utilities.ExcelReader import ExcelReader
 
 FILE_PATH = r"C:\Users\raghunath_b\PycharmProjects\Web_Automation_Framework\Sample Book.xlsx"
 
+def test_data_path(context):
+    return context.config.userdata.get("test_data_path", FILE_PATH)
+
 @given('the URL is opened')
 def step_open_url(context):
     driver_engine = DriverEngine()
 
-    context.driver = driver_engine.get_chrome_driver()
-    context.page = demoNocucu_page(driver=context.driver)
+    # a pooled session is reset between scenarios instead of relaunching Chrome
+    context.driver_engine = driver_engine
+    context.driver = driver_engine.checkout_driver()
+    driver_engine.prewarm_driver()
+    # element handles are cached per page and dropped when the scenario ends
+    context.pages = PageObjectManager(context.driver)
+    context.page = context.pages.get_demoNocucu()
     context.utils = Utilities()
     context.xlread = ExcelReader()
     context.driver.get("https://testautomationpractice.blogspot.com/")
@@ -40,27 +48,37 @@ def step_then(context):
 @then('Enter your full name {string}')
 def step_then(context, string):
     HEADER_SUBSTRING = "Name"
-    name = context.xlread.get_data_as_string(FILE_PATH, string[1:-1], HEADER_SUBSTRING)
+    name = context.xlread.get_scenario_record(context, test_data_path(context), string[1:-1]).field(HEADER_SUBSTRING)
     context.page.input_name.send_keys(name)
 
 @then('Enter your Email {string}')
 def step_then(context, string):
     HEADER_SUBSTRING = "Email"
-    email = context.xlread.get_data_as_string(FILE_PATH, string[1:-1], HEADER_SUBSTRING)
+    email = context.xlread.get_scenario_record(context, test_data_path(context), string[1:-1]).field(HEADER_SUBSTRING)
     mail = context.page.input_email
     mail.send_keys(email)
 
 @then('Enter your phonenumber {string}')
 def step_then(context, string):
     HEADER_SUBSTRING = "Phone"
-    txt = context.xlread.get_data_as_string(FILE_PATH, string[1:-1], HEADER_SUBSTRING)
+    txt = context.xlread.get_scenario_record(context, test_data_path(context), string[1:-1]).field(HEADER_SUBSTRING)
     phone = context.page.input_phone
     phone.send_keys(txt)
 
+@then('Enter your contact details {string}')
+def step_then(context, string):
+    record = context.xlread.get_scenario_record(context, test_data_path(context), string[1:-1])
+    # name, email and phone set in one script call instead of a lookup and send_keys each
+    context.page.fill_form({
+        "input_name": record.field("Name"),
+        "input_email": record.field("Email"),
+        "input_phone": record.field("Phone"),
+    })
+
 @then('Scroll until visible and enter name in section 1')
 def step_scroll_and_enter_section_name(context):
     HEADER_SUBSTRING = "Text"
-    txt = context.xlread.get_data_as_string(FILE_PATH, "Sample sheet 1", HEADER_SUBSTRING)
+    txt = context.xlread.get_scenario_record(context, test_data_path(context), "Sample sheet 1").field(HEADER_SUBSTRING)
     context.utils.web_scroll_to_element(context.page.input_misc)
     input_misc = context.page.input_misc
     context.utils.tap_element_simple(context.driver, input_misc, 10)
@@ -68,7 +86,7 @@ def step_scroll_and_enter_section_name(context):
 
 @then('close the driver')
 def step_close_driver(context):
-    context.driver.close()
+    context.driver_engine.checkin_driver(context.driver)
 
 
 
@@ -0,0 +1,274 @@
+import atexit
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+from openpyxl import load_workbook
+
+from utilities.TestDataStore import sidecar_dir_for
+
+# Configure module logger
+logger = logging.getLogger(__name__)
+
+FREE = "free"
+RESERVED = "reserved"
+USED = "used"
+
+# account_claims layout; version 1 was the pickled, pid-owned "accounts" table
+JOURNAL_SCHEMA_VERSION = "2"
+
+
+class AccountClaimService:
+    """
+    Hands out un-flagged test accounts (Flag == 'No') from a brand sheet to many
+    processes without two of them ever getting the same row.
+
+    Claims are coordinated through a SQLite journal next to the workbook: each process
+    reserves a random batch of rows per Type inside a `BEGIN IMMEDIATE` transaction,
+    then serves claims from its in-memory pool in O(1). Used rows are written back to
+    the workbook's Flag column in bulk, and unused reservations are released at exit.
+    A reservation is a lease that every reserve/claim of its owner renews; leases of
+    a worker that died (or stopped claiming) expire after lease_seconds and the rows
+    become free again.
+    """
+
+    def __init__(self, file_path: str, sheet_name: str, batch_size: int = 8, lease_seconds: float = 600.0):
+        self.file_path = os.path.abspath(file_path)
+        self.sheet_name = sheet_name
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.pid = os.getpid()
+        # unique across hosts sharing the journal and across pid reuse
+        self.owner = f"{socket.gethostname()}:{self.pid}:{uuid.uuid4().hex[:8]}"
+        self._pools: Dict[str, Deque[Tuple[int, Dict[str, str]]]] = {}
+        self._lock = threading.Lock()
+
+        journal_dir = sidecar_dir_for(self.file_path)
+        os.makedirs(journal_dir, exist_ok=True)
+        self.journal_path = os.path.join(journal_dir, f"{os.path.basename(self.file_path)}.{sheet_name}.claims.sqlite")
+        self._conn = sqlite3.connect(self.journal_path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._migrate()
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS account_claims (
+                row_num INTEGER PRIMARY KEY,
+                type TEXT,
+                state TEXT,
+                owner TEXT,
+                lease_until REAL,
+                synced INTEGER,
+                data TEXT
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS account_claims_type_state ON account_claims (type, state)")
+        self._seed()
+        atexit.register(self.close)
+
+    def _migrate(self) -> None:
+        """
+        One-off upgrade of a journal written by an older schema.
+        """
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = self._conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if version is None or version[0] != JOURNAL_SCHEMA_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS accounts")
+                # its source_stat described the dropped table: seed the new one
+                self._conn.execute("DELETE FROM meta WHERE key = 'source_stat'")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (JOURNAL_SCHEMA_VERSION,))
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _seed(self) -> None:
+        """
+        Load the sheet into the journal. The journal is kept while the workbook is the one
+        it last saw (or wrote). When the workbook has changed since, free and synced rows
+        are re-read from it; rows a worker still holds (a live reservation, or a claim
+        whose flag is not written back yet) are kept as they are.
+        """
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            seen = self._conn.execute("SELECT value FROM meta WHERE key = 'source_stat'").fetchone()
+            if seen is None or seen[0] != self._source_stat():
+                if seen is not None:
+                    logger.info("'%s' changed outside the claim journal, reloading free accounts", self.file_path)
+                self._conn.execute(
+                    "DELETE FROM account_claims WHERE state = ? OR (state = ? AND synced = 1) "
+                    "OR (state = ? AND lease_until < ?)",
+                    (FREE, USED, RESERVED, time.time()))
+                wb = load_workbook(self.file_path, read_only=True)
+                try:
+                    rows = wb[self.sheet_name].iter_rows(values_only=True)
+                    headers = list(next(rows, ()))
+                    type_idx = headers.index('Type')
+                    flag_idx = headers.index('Flag')
+                    records = []
+                    for row_num, values in enumerate(rows, start=2):
+                        values = tuple(values) + (None,) * (len(headers) - len(values))
+                        state = FREE if values[flag_idx] == 'No' else USED
+                        data = {headers[i]: values[i] for i in range(len(headers))}
+                        records.append((row_num, values[type_idx], state, None, None, 1,
+                                        json.dumps(data, default=str)))
+                finally:
+                    wb.close()
+                self._conn.executemany("INSERT OR IGNORE INTO account_claims VALUES (?, ?, ?, ?, ?, ?, ?)", records)
+                self._record_source_stat()
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _source_stat(self) -> str:
+        stat = os.stat(self.file_path)
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def _record_source_stat(self) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta VALUES ('source_stat', ?)", (self._source_stat(),))
+
+    def _release_expired_reservations(self) -> None:
+        self._conn.execute(
+            "UPDATE account_claims SET state = ?, owner = NULL, lease_until = NULL "
+            "WHERE state = ? AND lease_until < ?",
+            (FREE, RESERVED, time.time()))
+
+    def _renew_lease(self) -> None:
+        self._conn.execute(
+            "UPDATE account_claims SET lease_until = ? WHERE state = ? AND owner = ?",
+            (time.time() + self.lease_seconds, RESERVED, self.owner))
+
+    def _reserve_batch(self, type_value: str) -> List[Tuple[int, Dict[str, str]]]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            picked = self._conn.execute(
+                "SELECT row_num, data FROM account_claims WHERE type = ? AND state = ? ORDER BY RANDOM() LIMIT ?",
+                (type_value, FREE, self.batch_size)).fetchall()
+            if not picked:
+                self._release_expired_reservations()
+                # near the end of the pool, take over rows other workers reserved but not yet used
+                picked = self._conn.execute(
+                    "SELECT row_num, data FROM account_claims WHERE type = ? AND state IN (?, ?) ORDER BY state = ? DESC, "
+                    "RANDOM() LIMIT 1",
+                    (type_value, FREE, RESERVED, FREE)).fetchall()
+            self._conn.executemany(
+                "UPDATE account_claims SET state = ?, owner = ? WHERE row_num = ?",
+                [(RESERVED, self.owner, row_num) for row_num, _ in picked])
+            self._renew_lease()
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return [(row_num, json.loads(data)) for row_num, data in picked]
+
+    def claim(self, type_value: str) -> Dict[str, str]:
+        """
+        Claim one un-flagged account of the given Type and return its row as a dict.
+        """
+        with self._lock:
+            pool = self._pools.setdefault(type_value, deque())
+            while True:
+                if not pool:
+                    pool.extend(self._reserve_batch(type_value))
+                if not pool:
+                    raise ValueError(f"No un-flagged rows for Type='{type_value}'")
+                row_num, result = pool.popleft()
+                # a reservation taken over by another worker no longer matches and is skipped
+                claimed = self._conn.execute(
+                    "UPDATE account_claims SET state = ?, synced = 0 WHERE row_num = ? AND state = ? AND owner = ?",
+                    (USED, row_num, RESERVED, self.owner)).rowcount
+                if claimed:
+                    # heartbeat: still using the rest of the batch
+                    self._renew_lease()
+                    return dict(result)
+
+    def sync(self) -> int:
+        """
+        Write the Flag of every used-but-unsynced row back to the workbook in one save.
+        Returns the number of rows written.
+        """
+        # imported here: ExcelReader imports DriverEngine, which imports this module
+        from utilities.ExcelReader import excel_write_buffer
+
+        with self._lock:
+            rows = [row_num for (row_num,) in self._conn.execute(
+                "SELECT row_num FROM account_claims WHERE state = ? AND synced = 0", (USED,))]
+            if not rows:
+                return 0
+            # the save runs under the workbook's own write lock, not the journal's, so
+            # other workers keep reserving and claiming meanwhile; writing a flag that
+            # another worker also syncs is harmless
+            for row_num in rows:
+                excel_write_buffer.write(self.file_path, self.sheet_name, 'Flag', row_num, 'Yes')
+            if not excel_write_buffer.flush(self.file_path):
+                raise RuntimeError(f"Failed to write claimed flags to '{self.file_path}'")
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._record_source_stat()
+                self._conn.executemany(
+                    "UPDATE account_claims SET synced = 1 WHERE row_num = ?", [(row_num,) for row_num in rows])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def release(self) -> None:
+        """
+        Return this process's unused reservations to the shared pool.
+        """
+        with self._lock:
+            for pool in self._pools.values():
+                pool.clear()
+            self._conn.execute(
+                "UPDATE account_claims SET state = ?, owner = NULL, lease_until = NULL WHERE state = ? AND owner = ?",
+                (FREE, RESERVED, self.owner))
+
+    def close(self) -> None:
+        try:
+            self.release()
+            self.sync()
+        except sqlite3.ProgrammingError:
+            return  # already closed
+        except Exception:
+            logger.exception("Failed to close claim journal for '%s'", self.file_path)
+        self._conn.close()
+
+
+_services: Dict[Tuple[str, str], AccountClaimService] = {}
+_services_lock = threading.Lock()
+
+
+def get_claim_service(file_path: str, sheet_name: str) -> AccountClaimService:
+    """
+    Per-process claim service for a workbook sheet.
+    """
+    key = (os.path.abspath(file_path), sheet_name)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None or service.pid != os.getpid():
+            service = AccountClaimService(file_path, sheet_name)
+            _services[key] = service
+        return service
+
+
+def sync_all_claims() -> None:
+    """
+    Flush the flags of all claimed accounts back to their workbooks.
+    """
+    with _services_lock:
+        services = list(_services.values())
+    for service in services:
+        service.sync()
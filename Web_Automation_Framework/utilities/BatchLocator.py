@@ -0,0 +1,71 @@
+"""
+Resolve many locators with one execute_script instead of one find_element each.
+
+LOCATE_JS defines locate(by, value), the in-page equivalent of find_element for
+the Selenium By strategies, for scripts that look elements up themselves (see
+utilities.FormFill). resolve_locators() returns the elements found and the names
+of the locators that matched nothing.
+"""
+import logging
+from typing import Dict, List, Tuple
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+# Configure module logger
+logger = logging.getLogger(__name__)
+
+Locator = Tuple[str, str]
+
+LOCATE_JS = """
+function locate(by, value) {
+    switch (by) {
+        case 'id':
+            return document.getElementById(value);
+        case 'css selector':
+            return document.querySelector(value);
+        case 'xpath':
+            return document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null)
+                .singleNodeValue;
+        case 'name':
+            return document.querySelector('[name="' + CSS.escape(value) + '"]');
+        case 'class name':
+            return document.getElementsByClassName(value)[0] || null;
+        case 'tag name':
+            return document.getElementsByTagName(value)[0] || null;
+        case 'link text':
+        case 'partial link text':
+            for (const link of document.querySelectorAll('a')) {
+                const text = link.innerText.trim();
+                if (by === 'link text' ? text === value : text.includes(value)) return link;
+            }
+            return null;
+    }
+    throw new Error('Unsupported locator strategy: ' + by);
+}
+"""
+
+RESOLVE_LOCATORS_JS = LOCATE_JS + """
+return arguments[0].map(([by, value]) => {
+    try {
+        return locate(by, value);
+    } catch (e) {
+        return null;  // invalid selector: reported as missing
+    }
+});
+"""
+
+
+def resolve_locators(driver: WebDriver, locators: Dict[str, Locator]) -> Tuple[Dict[str, WebElement], List[str]]:
+    """
+    ({name: element}, [names not found]) for {name: (By, value)}, in one round trip.
+    """
+    names = list(locators)
+    elements = driver.execute_script(RESOLVE_LOCATORS_JS, [list(locators[name]) for name in names]) or []
+    found, missing = {}, []
+    for name, element in zip(names, elements):
+        if element is None:
+            missing.append(name)
+        else:
+            found[name] = element
+    return found, missing
@@ -0,0 +1,173 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceNotModifiedError
+from azure.storage.blob import BlobServiceClient
+
+# Configure module logger
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTAINER = "moes-mobile-testdata"
+
+_clients: Dict[str, BlobServiceClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_blob_service_client(conn_str: Optional[str] = None) -> BlobServiceClient:
+    """
+    One pooled BlobServiceClient per connection string (APPPACKAGE by default).
+    """
+    conn_str = conn_str or os.getenv("APPPACKAGE")
+    if not conn_str:
+        raise RuntimeError("Missing APPPACKAGE environment variable")
+    with _clients_lock:
+        client = _clients.get(conn_str)
+        if client is None:
+            client = BlobServiceClient.from_connection_string(conn_str)
+            _clients[conn_str] = client
+        return client
+
+
+def set_blob_service_client(client, conn_str: Optional[str] = None) -> None:
+    """
+    Register a client (e.g. a local stand-in service or a mock) for a connection string.
+    """
+    conn_str = conn_str or os.getenv("APPPACKAGE", "")
+    with _clients_lock:
+        _clients[conn_str] = client
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp_path, path)
+
+
+class BlobCache:
+    """
+    Disk cache of downloaded test-data blobs, shared by every worker on the machine.
+
+    Blob bytes live under objects/ named by their sha256; index/ maps a blob name to
+    its last seen ETag and object. A cached blob is revalidated with a conditional
+    download (If-None-Match) at most every `max_age_seconds`, so an unchanged blob
+    costs one 304 instead of a full transfer.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, container_name: str = DEFAULT_CONTAINER,
+                 max_age_seconds: float = 30.0):
+        self.cache_dir = cache_dir or os.getenv("TESTDATA_BLOB_CACHE") or os.path.join(
+            os.path.expanduser("~"), ".cache", "web_automation_framework", "blobs")
+        self.container_name = container_name
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.seconds_saved = 0.0
+        self._checked_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(self.cache_dir, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(self.cache_dir, "index"), exist_ok=True)
+
+    def _index_path(self, blob_name: str) -> str:
+        digest = hashlib.sha256(f"{self.container_name}/{blob_name}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, "index", f"{digest}.json")
+
+    def _object_path(self, sha256: str, blob_name: str) -> str:
+        # keep the extension so openpyxl recognises the file type
+        return os.path.join(self.cache_dir, "objects", sha256 + os.path.splitext(blob_name)[1])
+
+    def _read_index(self, blob_name: str) -> Optional[dict]:
+        try:
+            with open(self._index_path(blob_name), "r", encoding="utf-8") as fh:
+                entry = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(self._object_path(entry["sha256"], blob_name)):
+            return None
+        return entry
+
+    def _record_hit(self, entry: dict) -> None:
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += entry["size"]
+            self.seconds_saved += entry["download_seconds"]
+
+    def fetch(self, blob_name: str, client=None) -> str:
+        """
+        Return a local path holding the current content of blob_name.
+        """
+        entry = self._read_index(blob_name)
+        if entry is not None and time.monotonic() - self._checked_at.get(blob_name, float("-inf")) < self.max_age_seconds:
+            self._record_hit(entry)
+            return self._object_path(entry["sha256"], blob_name)
+
+        client = client or get_blob_service_client()
+        blob = client.get_container_client(self.container_name).get_blob_client(blob_name)
+
+        started = time.perf_counter()
+        try:
+            if entry is not None:
+                stream = blob.download_blob(etag=entry["etag"], match_condition=MatchConditions.IfModified)
+            else:
+                stream = blob.download_blob()
+            data = stream.readall()
+        except ResourceNotModifiedError:
+            self._checked_at[blob_name] = time.monotonic()
+            self._record_hit(entry)
+            return self._object_path(entry["sha256"], blob_name)
+        elapsed = time.perf_counter() - started
+
+        sha256 = hashlib.sha256(data).hexdigest()
+        object_path = self._object_path(sha256, blob_name)
+        if not os.path.exists(object_path):
+            _write_atomic(object_path, data)
+        new_entry = {
+            "blob_name": blob_name,
+            "etag": stream.properties.etag,
+            "sha256": sha256,
+            "size": len(data),
+            "download_seconds": elapsed,
+        }
+        _write_atomic(self._index_path(blob_name), json.dumps(new_entry).encode("utf-8"))
+        self._checked_at[blob_name] = time.monotonic()
+        with self._lock:
+            self.misses += 1
+        return object_path
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytes_saved": self.bytes_saved,
+                "seconds_saved": round(self.seconds_saved, 3),
+            }
+
+    def report(self) -> None:
+        stats = self.stats()
+        if stats["hits"] or stats["misses"]:
+            logger.info(
+                "Blob cache: %d hits, %d misses, %d bytes and %.2fs of downloads saved",
+                stats["hits"], stats["misses"], stats["bytes_saved"], stats["seconds_saved"])
+
+
+_blob_cache: Optional[BlobCache] = None
+_blob_cache_lock = threading.Lock()
+
+
+def get_blob_cache() -> BlobCache:
+    global _blob_cache
+    with _blob_cache_lock:
+        if _blob_cache is None:
+            _blob_cache = BlobCache()
+            atexit.register(_blob_cache.report)
+        return _blob_cache
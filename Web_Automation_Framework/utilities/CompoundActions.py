@@ -0,0 +1,155 @@
+"""
+Interactions done in one injected script instead of several WebDriver commands.
+
+tap_element used to wait for visibility (polling), scroll with execute_script and
+then click: 3-5 HTTP round trips, each 150-300 ms against BrowserStack.
+compound_click() scrolls the element into view, checks it is visible, enabled
+and not covered, and clicks it with one execute_script per attempt. Only
+elements whose default action needs a trusted event (file inputs, selects,
+links opening another window, or anything marked data-trusted-click) are
+checked by the script and then clicked natively.
+
+action_metrics counts the WebDriver commands each action sends, so the old and
+compound paths can be compared (DriverEngine.compound_actions switches them).
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+# Configure module logger
+logger = logging.getLogger(__name__)
+
+AUTO = "auto"
+NATIVE = "native"
+JS = "js"
+
+# {status: "clicked"} after a JS click, {status: "ready"} when the caller has to
+# click natively, {status: "waiting", reason} when the element is not clickable yet
+COMPOUND_CLICK_JS = """
+const element = arguments[0], mode = arguments[1], requireEnabled = arguments[2];
+if (!element.isConnected) return {status: 'waiting', reason: 'detached'};
+element.scrollIntoView({block: 'center', inline: 'center'});
+const rect = element.getBoundingClientRect();
+const style = window.getComputedStyle(element);
+if (rect.width === 0 || rect.height === 0 || style.visibility === 'hidden' || style.display === 'none') {
+    return {status: 'waiting', reason: 'not visible'};
+}
+if (requireEnabled && (element.disabled || element.getAttribute('aria-disabled') === 'true')) {
+    return {status: 'waiting', reason: 'disabled'};
+}
+const x = rect.left + rect.width / 2, y = rect.top + rect.height / 2;
+const root = element.getRootNode();
+const top = (root.elementFromPoint ? root : document).elementFromPoint(x, y);
+// a JS click reaches a covered element anyway, which is why callers ask for one
+if (mode !== 'js' && top && top !== element && !element.contains(top)) {
+    return {status: 'waiting', reason: 'covered by <' + top.tagName.toLowerCase() + (top.id ? '#' + top.id : '') + '>'};
+}
+const tag = element.tagName.toLowerCase();
+const needsTrusted = element.hasAttribute('data-trusted-click')
+    || (tag === 'input' && element.type === 'file')
+    || tag === 'select' || tag === 'option'
+    || (tag === 'a' && element.target && element.target !== '_self');
+if (mode === 'native' || (mode === 'auto' && needsTrusted)) return {status: 'ready'};
+element.click();
+return {status: 'clicked'};
+"""
+
+
+def instrument(driver: WebDriver) -> None:
+    """
+    Count every command the driver sends (element commands go through driver.execute too).
+    """
+    if getattr(driver, "_waf_round_trips", None) is not None:
+        return
+    driver._waf_round_trips = 0
+    original_execute = driver.execute
+
+    def counting_execute(driver_command, params=None):
+        driver._waf_round_trips += 1
+        return original_execute(driver_command, params)
+
+    driver.execute = counting_execute
+
+
+class ActionMetrics:
+    """
+    Round trips and time per action name.
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, driver: WebDriver, action: str):
+        instrument(driver)
+        before = driver._waf_round_trips
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(action, driver._waf_round_trips - before, time.perf_counter() - started)
+
+    def record(self, action: str, round_trips: int, seconds: float) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(action, {"calls": 0, "round_trips": 0, "seconds": 0.0})
+            stats["calls"] += 1
+            stats["round_trips"] += round_trips
+            stats["seconds"] += seconds
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        {action: {calls, round_trips, round_trips_per_call, mean_ms}}
+        """
+        with self._lock:
+            return {
+                action: {
+                    "calls": values["calls"],
+                    "round_trips": values["round_trips"],
+                    "round_trips_per_call": round(values["round_trips"] / values["calls"], 2),
+                    "mean_ms": round(values["seconds"] / values["calls"] * 1000, 1),
+                }
+                for action, values in self._stats.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+action_metrics = ActionMetrics()
+
+
+def compound_click(driver: WebDriver, element: WebElement, timeout: float = 30, mode: str = AUTO,
+                   require_enabled: bool = False, poll_seconds: float = 0.1) -> str:
+    """
+    Scroll to, check and click element, one script call per attempt. mode "auto"
+    clicks natively only when the element needs a trusted event, "native" always
+    does, "js" never does. When the element is still not clickable after timeout
+    it is clicked natively, so the usual Selenium exception explains why.
+    Returns "js" or "native".
+    """
+    deadline = time.perf_counter() + timeout
+    while True:
+        state = driver.execute_script(COMPOUND_CLICK_JS, element, mode, require_enabled) or {}
+        if state.get("status") == "clicked":
+            return JS
+        if state.get("status") == "ready":
+            element.click()
+            return NATIVE
+        if state.get("reason") == "detached" or time.perf_counter() >= deadline:
+            logger.warning("Element still %s after %ss, trying a native click", state.get("reason"), timeout)
+            element.click()
+            return NATIVE
+        time.sleep(poll_seconds)
+
+
+def log_action_stats() -> None:
+    stats = action_metrics.stats()
+    if stats:
+        logger.info("WebDriver round trips per action: %s", stats)
@@ -1,14 +1,30 @@
 import os
+import atexit
 import logging
 import configparser  # for loading .properties files
 import random  # for Java Random
 import threading  # for ThreadLocal analogues
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Set
+from urllib.parse import urlsplit
 from selenium import webdriver  # Selenium WebDriver
+from selenium.webdriver.chromium.webdriver import ChromiumDriver
+from selenium.webdriver.remote.command import Command
 from selenium.webdriver.chrome.service import Service  # ChromeDriver service
+from selenium.webdriver.firefox.service import Service as FirefoxService  # GeckoDriver service
+from selenium.webdriver.common import utils as selenium_utils
+from selenium.webdriver.common.driver_finder import DriverFinder
 from selenium.webdriver.chrome.options import Options  # Chrome options
 from selenium.webdriver.firefox.options import Options as FirefoxOptions  # Firefox options
 from selenium.webdriver.support.ui import WebDriverWait  # Equivalent to Selenium WebDriverWait
 from openpyxl import load_workbook
+from utilities.TestDataStore import get_store, build_row_index
+from utilities.AccountClaimService import get_claim_service
+from utilities.LaunchProfiles import apply_chrome_profile, apply_firefox_profile, normalize_profile
+from utilities.NetworkPolicy import attach_network_policy
+from utilities.ReplayCache import get_replay_cache
+from utilities.GridConnection import get_grid_client
 
 # Incompatibility notes:
 # java.io.FileInputStream -> Python uses open()
@@ -23,6 +39,472 @@ from openpyxl import load_workbook
 # Configure module logger
 logger = logging.getLogger(__name__)
 
+# Clears local/session storage and deletes every IndexedDB database of the current origin
+CLEAR_STORAGE_JS = """
+const done = arguments[arguments.length - 1];
+try { localStorage.clear(); sessionStorage.clear(); } catch (e) { /* opaque origin, storage disabled */ }
+if (!window.indexedDB || !indexedDB.databases) { done(); return; }
+indexedDB.databases().then(dbs => Promise.all(dbs.map(db => new Promise(resolve => {
+    const request = indexedDB.deleteDatabase(db.name);
+    request.onsuccess = request.onerror = request.onblocked = () => resolve();
+})))).then(() => done(), () => done());
+"""
+
+
+def _origin(url: str) -> Optional[str]:
+    parts = urlsplit(url or "")
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def track_visited_origins(driver: webdriver.Remote) -> Set[str]:
+    """
+    Remember the origin of every URL the driver navigates to with get(), in
+    driver._waf_visited_origins, so a reset can clear their storage.
+    """
+    visited = getattr(driver, "_waf_visited_origins", None)
+    if visited is not None:
+        return visited
+    visited = driver._waf_visited_origins = set()
+    original_execute = driver.execute
+
+    def tracking_execute(driver_command, params=None):
+        if driver_command == Command.GET and params:
+            origin = _origin(params.get("url"))
+            if origin:
+                visited.add(origin)
+        return original_execute(driver_command, params)
+
+    driver.execute = tracking_execute
+    return visited
+
+
+class DriverPool:
+    """
+    Keeps browser sessions running between scenarios.
+
+    checkout() hands out an idle session, or launches one while fewer than max_size
+    sessions are checked out, or waits for a session to be checked in. checkin()
+    resets the session (cookies, local/session storage, IndexedDB, extra windows,
+    about:blank) so the next scenario starts clean. A session is quit instead of
+    reused after max_uses checkouts, after a failed scenario, or when the reset
+    itself fails. prewarm() launches the next session in the background; no more
+    than max_browsers sessions (checked out, idle or launching) exist at once.
+    """
+
+    def __init__(self, factory: Callable[[], webdriver.Remote], max_size: int = 1, max_uses: int = 25,
+                 max_browsers: Optional[int] = None):
+        self.factory = factory
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.max_browsers = max_browsers or max_size + 1
+        self._idle: Deque[webdriver.Remote] = deque()
+        self._uses: Dict[int, int] = {}
+        self._in_use: Dict[int, webdriver.Remote] = {}
+        self._size = 0
+        self._warming = 0
+        self._launching = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self.checkouts = 0
+        self.reuses = 0
+        self.warm_hits = 0
+        self.launches = 0
+        self.recycled = 0
+        self.wait_seconds = 0.0
+
+    def checkout(self, timeout: Optional[float] = None) -> webdriver.Remote:
+        started = time.perf_counter()
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Driver pool is shut down")
+                if len(self._in_use) + self._launching < self.max_size:
+                    if self._idle:
+                        break
+                    if not self._warming and self._size < self.max_browsers:
+                        break
+                # a warm session still launching is ready sooner than a new one
+                if not self._cond.wait(timeout):
+                    raise TimeoutError(f"No browser session available after {timeout}s")
+            self.wait_seconds += time.perf_counter() - started
+            self.checkouts += 1
+            if self._idle:
+                driver = self._idle.popleft()
+                if self._uses[id(driver)]:
+                    self.reuses += 1
+                else:
+                    self.warm_hits += 1
+                self._uses[id(driver)] += 1
+                self._in_use[id(driver)] = driver
+                return driver
+            # reserve the slot before launching outside the lock
+            self._size += 1
+            self._launching += 1
+
+        try:
+            driver = self.factory()
+            track_visited_origins(driver)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._launching -= 1
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            self.launches += 1
+            self._launching -= 1
+            self._uses[id(driver)] = 1
+            self._in_use[id(driver)] = driver
+        return driver
+
+    def prewarm(self) -> bool:
+        """
+        Launch one session on a background thread for the next checkout, unless an idle
+        or launching session is already waiting or the browser cap is reached.
+        """
+        with self._cond:
+            if self._closed or self._idle or self._warming or self._size >= self.max_browsers:
+                return False
+            self._size += 1
+            self._warming += 1
+        threading.Thread(target=self._launch_warm, name="driver-prewarm", daemon=True).start()
+        return True
+
+    def _launch_warm(self) -> None:
+        try:
+            driver = self.factory()
+            track_visited_origins(driver)
+        except Exception:
+            logger.warning("Pre-warming a browser session failed", exc_info=True)
+            with self._cond:
+                self._size -= 1
+                self._warming -= 1
+                self._cond.notify_all()
+            return
+        with self._cond:
+            self.launches += 1
+            self._warming -= 1
+            self._uses[id(driver)] = 0
+            closed = self._closed
+            if not closed:
+                self._idle.append(driver)
+                self._cond.notify_all()
+        if closed:
+            self._discard(driver)
+
+    def owns(self, driver: webdriver.Remote) -> bool:
+        with self._cond:
+            return id(driver) in self._in_use
+
+    def checkin(self, driver: webdriver.Remote, failed: bool = False) -> None:
+        """
+        Return a session to the pool; unknown or already returned sessions are ignored.
+        """
+        with self._cond:
+            if self._in_use.pop(id(driver), None) is None:
+                return
+            recycle = failed or self._closed or self._uses[id(driver)] >= self.max_uses
+
+        if not recycle and not self.reset(driver):
+            recycle = True
+
+        if recycle:
+            self._discard(driver)
+            return
+        with self._cond:
+            self._idle.append(driver)
+            self._cond.notify_all()
+
+    def reset(self, driver: webdriver.Remote) -> bool:
+        """
+        Clear all per-scenario browser state; False if the session looks broken.
+        """
+        try:
+            origins = track_visited_origins(driver)
+            handles = driver.window_handles
+            # every open page clears its own origin's storage, which also covers
+            # origins reached by clicking rather than get()
+            for handle in reversed(handles):
+                driver.switch_to.window(handle)
+                origin = _origin(driver.current_url)
+                if origin:
+                    origins.add(origin)
+                    driver.execute_async_script(CLEAR_STORAGE_JS)
+                if handle != handles[0]:
+                    driver.close()
+            driver.switch_to.window(handles[0])
+
+            if isinstance(driver, ChromiumDriver):
+                # Chromium also clears the origins no window shows any more
+                for origin in sorted(origins):
+                    driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            origins.clear()
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except Exception:
+            logger.warning("Resetting pooled browser session failed, recycling it", exc_info=True)
+            return False
+
+    def _discard(self, driver: webdriver.Remote) -> None:
+        try:
+            driver.quit()
+        except Exception:
+            logger.debug("Quitting pooled browser session failed", exc_info=True)
+        with self._cond:
+            self._uses.pop(id(driver), None)
+            self._size -= 1
+            self.recycled += 1
+            self._cond.notify_all()
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+        for driver in idle:
+            self._discard(driver)
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            return {
+                "checkouts": self.checkouts,
+                "launches": self.launches,
+                "reuses": self.reuses,
+                "warm_hits": self.warm_hits,
+                "recycled": self.recycled,
+                "reuse_ratio": round(self.reuses / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
+
+
+_driver_pools: Dict[tuple, DriverPool] = {}
+_driver_pools_lock = threading.Lock()
+# grid and BrowserStack sessions: not pooled, quit at checkin (or at the end of the run)
+_unpooled_drivers: Dict[int, webdriver.Remote] = {}
+
+
+def _quit_unpooled(driver: webdriver.Remote) -> None:
+    with _driver_pools_lock:
+        if _unpooled_drivers.pop(id(driver), None) is None:
+            return  # already quit (the close step and after_scenario both check in)
+    try:
+        driver.quit()
+    except Exception:
+        logger.warning("Quitting remote browser session failed", exc_info=True)
+
+
+def shutdown_driver_pools() -> None:
+    """
+    Quit every pooled browser session and every remote session still open, and
+    log the pool statistics.
+    """
+    with _driver_pools_lock:
+        pools = list(_driver_pools.items())
+        _driver_pools.clear()
+        remote = list(_unpooled_drivers.values())
+    for driver in remote:
+        _quit_unpooled(driver)
+    for key, pool in pools:
+        pool.shutdown()
+        logger.info("Driver pool %s: %s", key, pool.stats())
+    stats = _service_registry.stats()
+    if stats["sessions"]:
+        logger.info("Driver services: %s", stats)
+    _service_registry.shutdown()
+
+
+class SharedServiceMixin:
+    """
+    Driver service process that outlives the sessions started against it.
+
+    WebDriver.quit() calls service.stop(), which is a no-op here; the process keeps
+    running until shutdown(). start() returns at once while the process is healthy
+    and restarts it on a fresh port when it has crashed or stopped answering.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.process = None
+        self.starts = 0
+        self.restarts = 0
+        self._start_lock = threading.Lock()
+
+    def is_healthy(self, attempts: int = 3) -> bool:
+        """
+        Process alive and answering /status; a busy driver gets a few tries before it
+        counts as hung, since restarting it ends every session it serves.
+        """
+        for attempt in range(attempts):
+            if self.process is None or self.process.poll() is not None:
+                return False
+            if self.is_connectable():
+                return True
+            if attempt + 1 < attempts:
+                time.sleep(0.5)
+        return False
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self.is_healthy():
+                return
+            if self.process is not None:
+                return_code = self.process.poll()
+                logger.warning("%s (pid %s) %s, restarting it", os.path.basename(self.path), self.process.pid,
+                               "stopped responding" if return_code is None else f"exited with {return_code}")
+                self._terminate_process()
+                self.port = selenium_utils.free_port()
+                self.restarts += 1
+            try:
+                super().start()
+            except BaseException:
+                self.shutdown()
+                raise
+            self.starts += 1
+
+    def stop(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        """
+        Really stop the driver process.
+        """
+        if self.process is not None:
+            super().stop()
+
+
+class SharedChromeService(SharedServiceMixin, Service):
+    pass
+
+
+class SharedFirefoxService(SharedServiceMixin, FirefoxService):
+    pass
+
+
+class DriverServiceRegistry:
+    """
+    The driver service processes of this worker, reused across sessions.
+
+    chromedriver serves any number of sessions, so there is a single one per
+    worker. geckodriver runs one session at a time, so each concurrent Firefox
+    session leases its own process and hands it back on quit for the next one.
+    Every lease health-checks the process (restarting it if needed) before a
+    session is created against it.
+    """
+
+    SERVICE_CLASSES = {"chrome": SharedChromeService, "firefox": SharedFirefoxService}
+    EXCLUSIVE = {"firefox"}
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._services: Dict[str, list] = {}
+        self._idle: Dict[str, Deque[SharedServiceMixin]] = {}
+        self._browser_paths: Dict[str, str] = {}
+        self.sessions = 0
+        self.reuses = 0
+        atexit.register(self.shutdown)
+
+    def new_driver(self, browser: str, options, factory: Callable[..., webdriver.Remote]) -> webdriver.Remote:
+        """
+        factory(service=..., options=...) against a leased service, e.g. webdriver.Chrome.
+        """
+        service = self.acquire(browser, options)
+        try:
+            driver = factory(service=service, options=options)
+        except BaseException:
+            self.release(browser, service)
+            raise
+        self._release_on_quit(driver, browser, service)
+        return driver
+
+    def acquire(self, browser: str, options) -> SharedServiceMixin:
+        with self._lock:
+            services = self._services.setdefault(browser, [])
+            idle = self._idle.setdefault(browser, deque())
+            if browser in self.EXCLUSIVE:
+                service = idle.popleft() if idle else None
+            else:
+                service = services[0] if services else None
+            if service is None:
+                service = self.SERVICE_CLASSES[browser]()
+                services.append(service)
+            else:
+                self.reuses += 1
+            self.sessions += 1
+        try:
+            self._resolve_paths(browser, service, options)
+            service.start()
+        except BaseException:
+            self.release(browser, service)
+            raise
+        return service
+
+    def _resolve_paths(self, browser: str, service: SharedServiceMixin, options) -> None:
+        # Selenium Manager only runs while service.path is unset, so remember the
+        # browser it picked and hand that to later sessions ourselves
+        if not service.path:
+            finder = DriverFinder(service, options)
+            service.path = service.env_path() or finder.get_driver_path()
+            if finder.get_browser_path():
+                with self._lock:
+                    self._browser_paths.setdefault(browser, finder.get_browser_path())
+        browser_path = self._browser_paths.get(browser)
+        if browser_path and not getattr(options, "binary_location", None):
+            options.binary_location = browser_path
+            options.browser_version = None
+
+    def release(self, browser: str, service: SharedServiceMixin) -> None:
+        if browser not in self.EXCLUSIVE:
+            return
+        with self._lock:
+            if service in self._services.get(browser, []):
+                self._idle.setdefault(browser, deque()).append(service)
+                return
+        # the registry was shut down while the session ran
+        service.shutdown()
+
+    def _release_on_quit(self, driver: webdriver.Remote, browser: str, service: SharedServiceMixin) -> None:
+        original_quit = driver.quit
+        released = threading.Event()
+
+        def quit_and_release() -> None:
+            try:
+                original_quit()
+            finally:
+                if not released.is_set():
+                    released.set()
+                    self.release(browser, service)
+
+        driver.quit = quit_and_release
+
+    def shutdown(self) -> None:
+        with self._lock:
+            services = [service for group in self._services.values() for service in group]
+            self._services.clear()
+            self._idle.clear()
+        for service in services:
+            try:
+                service.shutdown()
+            except Exception:
+                logger.debug("Stopping driver service failed", exc_info=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            services = [service for group in self._services.values() for service in group]
+            return {
+                "sessions": self.sessions,
+                "reuses": self.reuses,
+                "processes": len(services),
+                "starts": sum(service.starts for service in services),
+                "restarts": sum(service.restarts for service in services),
+            }
+
+
+_service_registry = DriverServiceRegistry()
+
 
 class DriverEngine:
     # --- Chunk 1: Configuration Fields ---
@@ -34,6 +516,7 @@ class DriverEngine:
     platform_name: str = None
     headless_browser: str = None
     field_validation: str = None
+    launch_profile: str = "default"  # default / fast (behave userdata "launch_profile"), see utilities.LaunchProfiles
     web_app_url: str = None
     op_system: str = None
     browserstack_userid: str = None
@@ -79,6 +562,16 @@ class DriverEngine:
     fillo = None  # stub for Fillo library not available in Python
     con_config = None  # Connection stub
     build_name: str = None
+    driver_pool_size: int = 1
+    driver_pool_max_uses: int = 25
+    max_concurrent_browsers: int = 2  # checked-out plus pre-warmed sessions per process
+    network_policy_path: str = None  # JSON block/allow/stub lists, see utilities.NetworkPolicy
+    replay_mode: str = None  # off / record / replay, see utilities.ReplayCache
+    replay_rules_path: str = None
+    grid_url: str = os.getenv("SELENIUM_GRID_URL")  # hub for Platform "Grid"
+    grid_max_sessions: int = 4  # sessions per process; further requests queue for a slot
+    wait_mode: str = None  # smart (readiness checks) / legacy (fixed sleeps), see utilities.WaitEngine
+    compound_actions: bool = True  # single-script clicks, see utilities.CompoundActions
 
     def load_properties(self, path: str) -> configparser.ConfigParser:
         """
@@ -111,6 +604,9 @@ class DriverEngine:
                 platformName = rsConfig.getField("Platform")
                 headlessBrowser = rsConfig.getField("HeadlessBrowser")
                 fieldValidation = rsConfig.getField("FieldValidation")
+                # the Config sheet can override the behave userdata value (features/environment.py)
+                self.launch_profile = normalize_profile(rsConfig.getField("LaunchProfile") or self.launch_profile)
+                self.grid_url = rsConfig.getField("GridUrl") or self.grid_url
                 # deviceName = rsConfig.getField("DeviceName")
                 # deviceOSVersion = rsConfig.getField("DeviceOSVersion")
 
@@ -119,6 +615,7 @@ class DriverEngine:
             print("Browser_Name :", browserName)
             print("Platform_Name :", platformName)
             print("Headless_Browser :", headlessBrowser)
+            print("Launch_Profile :", self.launch_profile)
 
             if environmentName and environmentName.lower() == "live":
                 webAppUrl = f"https://{brand}.com"
@@ -158,6 +655,8 @@ class DriverEngine:
         """
         Determine if execution is local (not BrowserStack).
         """
+        if self.platform_name and self.platform_name.lower() == "grid":
+            return False
         if self.platform_name and len(self.platform_name) >= 3:
             return not self.platform_name[:3].lower() == "bs_"
         return True
@@ -174,64 +673,68 @@ class DriverEngine:
             type_value: str
     ) -> dict[str, str]:
 
-        # --- 1) Open workbook & grab the sheet ---
-        wb = load_workbook(file_path)
-        ws = wb[sheet_name]
-
-        # --- 2) Read headers and find column indexes ---
-        headers = [cell.value for cell in ws[1]]  # first row = header
-        # map header name -> 1-based column index
-        idx = {name: i + 1 for i, name in enumerate(headers)}
-
-        # shorthand lookups
-        TYPE_COL = idx['Type']
-        FLAG_COL = idx['Flag']
-        EMAIL_COL = idx['Email']
-        ROWNUM_COL = idx.get('RowNum')  # assume there’s a RowNum column
-
-        # --- 3) Collect all candidate rows ---
-        candidates = []
-        for row in ws.iter_rows(min_row=2):  # skip header
-            if row[TYPE_COL - 1].value == type_value and row[FLAG_COL - 1].value == 'No':
-                candidates.append(row)
-
-        if not candidates:
-            raise ValueError(f"No un-flagged rows for Type='{type_value}'")
+        # Rows are claimed through a journal shared by all worker processes, so two
+        # workers never get the same account; flags reach the workbook in bulk.
+        return get_claim_service(file_path, sheet_name).claim(type_value)
 
-        chosen = random.choice(candidates)
-
-        result = {headers[i]: chosen[i].value for i in range(len(headers))}
+    def get_result_from_brand_sheet(
+            file_path: str,
+            sheet_name: str,
+            scenario_name,
+            key_columns: tuple = ("ScenarioName",)
+    ) -> dict[str, str]:
 
-        chosen[FLAG_COL - 1].value = 'Yes'
-        wb.save(file_path)
+        # scenario_name is a tuple of values when key_columns is a composite key
+        index = DriverEngine.get_results_from_brand_sheet(file_path, sheet_name, key_columns)
+        row = index.get(scenario_name)
+        if row is not None:
+            # a copy: the index is shared by every later lookup
+            return dict(row)
 
-        return result
+        if index:
+            logging.warning(f"No row with {'/'.join(key_columns)}='{scenario_name}' in {sheet_name}")
+        return {}
 
-    def get_result_from_brand_sheet(file_path: str, sheet_name: str, scenario_name: str) -> dict[str, str]:
+    @staticmethod
+    def get_results_from_brand_sheet(
+            file_path: str,
+            sheet_name: str,
+            key_columns: tuple = ("ScenarioName",)
+    ) -> dict:
+        """
+        Every row of a brand sheet keyed by key_columns, from a single scan.
 
+        The index is built once per compiled sidecar, so repeated lookups across
+        scenarios are dict hits until the workbook changes. It is shared: callers
+        must not modify the rows.
+        """
+        key_columns = tuple(key_columns)
         try:
-            wb = load_workbook(file_path, data_only=True)
-            ws = wb[sheet_name]
-        except Exception as e:
-            logging.error(f"Couldn’t open sheet '{sheet_name}' in '{file_path}': {e}")
-            return {}
+            # compiled sidecar first, the workbook itself as a fallback (also for a
+            # sheet the sidecar does not have)
+            store = get_store(file_path, data_only=True)
+            sheet = store.resolve_sheet(sheet_name)
+        except Exception:
+            logging.debug(f"Sidecar unavailable for '{file_path}', reading workbook directly", exc_info=True)
+            store = None
 
-        # 1) Read header row
-        headers = [cell.value for cell in ws[1]]
-        if "ScenarioName" not in headers:
-            logging.error(f"'ScenarioName' column not found in {sheet_name}")
+        try:
+            if store is not None:
+                return store.row_index(sheet, key_columns)
+
+            try:
+                wb = load_workbook(file_path, read_only=True, data_only=True)
+                ws = wb[sheet_name]
+            except Exception as e:
+                logging.error(f"Couldn’t open sheet '{sheet_name}' in '{file_path}': {e}")
+                return {}
+            try:
+                return build_row_index(ws.iter_rows(values_only=True), key_columns)
+            finally:
+                wb.close()
+        except KeyError as e:
+            logging.error(f"'{e.args[0]}' column not found in {sheet_name}")
             return {}
-        scenario_idx = headers.index("ScenarioName")
-
-        # 2) Scan data rows for the first match
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            if row[scenario_idx] == scenario_name:
-                # 3) Build and return a dict of column→value
-                return {headers[i]: row[i] for i in range(len(headers))}
-
-        # 4) No match found
-        logging.warning(f"No row with ScenarioName='{scenario_name}' in {sheet_name}")
-        return {}
 
     def get_chrome_driver(self) -> webdriver.Remote:
         """
@@ -241,7 +744,10 @@ class DriverEngine:
         options.add_argument("--disable-notifications")
         if self.headless_browser and self.headless_browser.lower() == "true":
             options.add_argument("--headless")
-        driver = webdriver.Chrome(service=Service(), options=options)
+        apply_chrome_profile(options, self.launch_profile)
+        driver = _service_registry.new_driver("chrome", options, webdriver.Chrome)
+        attach_network_policy(driver, self.network_policy_path,
+                              get_replay_cache(self.replay_mode, self.replay_rules_path))
         setattr(self.tl_driver, 'driver', driver)
         return driver
 
@@ -254,10 +760,71 @@ class DriverEngine:
         # FirefoxProfile not directly supported; use capabilities if needed
         if self.headless_browser and self.headless_browser.lower() == "true":
             options.add_argument("--headless")
-        driver = webdriver.Firefox(options=options)
+        apply_firefox_profile(options, self.launch_profile)
+        driver = _service_registry.new_driver("firefox", options, webdriver.Firefox)
         setattr(self.tl_driver, 'driver', driver)
         return driver
 
+    def get_local_driver(self) -> webdriver.Remote:
+        """
+        Launch a local browser for browser_name (Chrome when unset).
+        """
+        browser_name_upper = (self.browser_name or "chrome").upper()
+        if browser_name_upper == "SAFARI":
+            return self.get_safari_driver()
+        if browser_name_upper == "FIREFOX":
+            return self.get_firefox_driver()
+        return self.get_chrome_driver()
+
+    def get_driver_pool(self) -> DriverPool:
+        """
+        Pool of local sessions sharing this engine's browser options.
+        """
+        key = ((self.browser_name or "chrome").lower(), (self.headless_browser or "").lower(),
+               normalize_profile(self.launch_profile))
+        with _driver_pools_lock:
+            pool = _driver_pools.get(key)
+            if pool is None:
+                pool = DriverPool(self.get_local_driver, self.driver_pool_size, self.driver_pool_max_uses,
+                                  self.max_concurrent_browsers)
+                _driver_pools[key] = pool
+            return pool
+
+    def checkout_driver(self) -> webdriver.Remote:
+        """
+        Take a warm browser session from the pool instead of launching a new one.
+        """
+        driver = self.get_driver_pool().checkout()
+        network_policy = getattr(driver, "network_policy", None)
+        if network_policy is not None:
+            network_policy.start_scenario(getattr(self.tl_scenario_name, 'feature', None))
+        setattr(self.tl_driver, 'driver', driver)
+        return driver
+
+    def prewarm_driver(self) -> bool:
+        """
+        Start the next scenario's browser in the background while this one runs.
+        """
+        return self.get_driver_pool().prewarm()
+
+    def checkin_driver(self, driver: webdriver.Remote = None, failed: bool = False) -> None:
+        """
+        Reset the session and return it to the pool; failed sessions, and sessions
+        the pool does not own (grid, BrowserStack), are quit.
+        """
+        driver = driver or self.get_driver()
+        if driver is None:
+            return
+        with _driver_pools_lock:
+            pools = list(_driver_pools.values())
+        pool = next((pool for pool in pools if pool.owns(driver)), None)
+        if pool is not None:
+            pool.checkin(driver, failed=failed)
+        else:
+            _quit_unpooled(driver)
+        if self.get_driver() is driver:
+            setattr(self.tl_driver, 'driver', None)
+
     def get_safari_driver(self) -> webdriver.Remote:
         """
         Equivalent of getSafariDriver(): init Safari.
@@ -283,8 +850,6 @@ class DriverEngine:
 
     def get_remote_desktop_driver(self) -> webdriver.Remote:
 
-        self.multi_capabilities.set({})
-
         browserstack_options = {}
 
         if opSystem.lower() == "windows":
@@ -304,11 +869,13 @@ class DriverEngine:
         browserstack_options["networkLogs"] = True
         browserstack_options["selfHeal"] = True
         browserstack_options["sessionName"] = (
-            f"{self.tl_scenario_name.get()} - Browser : {browserName} OS: {opSystem}"
+            f"{getattr(self.tl_scenario_name, 'name', None)} - Browser : {browserName} OS: {opSystem}"
         )
         browserstack_options["buildName"] = self.build_name
 
-        self.multi_capabilities.get()["bstack:options"] = browserstack_options
+        # threading.local has no get/set: per-thread values are plain attributes
+        options.set_capability("bstack:options", browserstack_options)
+        setattr(self.multi_capabilities, 'options', options)
 
         final_capabilities = options.to_capabilities()
         final_capabilities["bstack:options"] = browserstack_options
@@ -318,15 +885,34 @@ class DriverEngine:
             "@hub-cloud.browserstack.com/wd/hub"
         )
 
-        return webdriver.Remote(command_executor=browserstack_url, options=self.multi_capabilities.get())
+        # sessions share one keep-alive connection pool to the hub
+        driver = get_grid_client(browserstack_url, self.grid_max_sessions).new_session(
+            self.multi_capabilities.options)
+        setattr(self.tl_driver, 'driver', driver)
+        return driver
 
         # raise NotImplementedError("get_remote_desktop_driver requires remote grid configuration")
 
     def get_remote_desktop_driver_with_url(self, grid_url: str) -> webdriver.Remote:
         """
-        Equivalent of getRemoteDesktopDriver(String): requires remote grid URL.
+        Equivalent of getRemoteDesktopDriver(String): a session on a self-hosted grid.
+
+        Sessions share one keep-alive connection pool to the hub; at most
+        grid_max_sessions run at once and creation is retried with backoff while
+        the grid is saturated (see utilities.GridConnection).
         """
-        raise NotImplementedError("get_remote_desktop_driver_with_url requires remote grid URL")
+        if not grid_url:
+            raise ValueError("get_remote_desktop_driver_with_url requires a grid URL (Config GridUrl)")
+        if (self.browser_name or "chrome").lower() == "firefox":
+            options = FirefoxOptions()
+        else:
+            options = Options()
+            options.add_argument("--disable-notifications")
+        if self.headless_browser and self.headless_browser.lower() == "true":
+            options.add_argument("--headless")
+        driver = get_grid_client(grid_url, self.grid_max_sessions).new_session(options)
+        setattr(self.tl_driver, 'driver', driver)
+        return driver
 
     def get_remote_android_mobile_driver(self) -> webdriver.Remote:
         """
@@ -349,16 +935,14 @@ class DriverEngine:
     def initialize_driver(self) -> None:
         driver = None
         if self.is_local():
-            browser_name_upper = self.browser_name.upper()
-            if browser_name_upper == "CHROME":
-                driver = self.get_chrome_driver()
-            elif browser_name_upper == "SAFARI":
-                driver = self.get_safari_driver()
-            elif browser_name_upper == "FIREFOX":
-                driver = self.get_firefox_driver()
+            # a warm session from the pool; the next scenario's browser starts in the background
+            driver = self.checkout_driver()
+            self.prewarm_driver()
         else:
             platform_name_upper = self.platform_name.upper()
-            if platform_name_upper == "BS_WEB":
+            if platform_name_upper == "GRID":
+                driver = self.get_remote_desktop_driver_with_url(self.grid_url)
+            elif platform_name_upper == "BS_WEB":
                 driver = self.get_remote_desktop_driver()
             elif platform_name_upper == "BS_MOBILEWEB":
                 if self.browser_name.lower() == "bs_mobilechrome":
@@ -369,7 +953,12 @@ class DriverEngine:
                     driver = self.get_ios_safari_browser()
                 else:
                     driver = self.get_remote_ios_mobile_driver()
+            if driver is not None:
+                with _driver_pools_lock:
+                    _unpooled_drivers[id(driver)] = driver
 
-        self.tl_driver.set(driver)
-        self.web_driver_wait.set(WebDriverWait(self.tl_driver.get(), self.element_wait_in_seconds))
-        self.launch_browser()
+        setattr(self.tl_driver, 'driver', driver)
+        setattr(self.web_driver_wait, 'wait', WebDriverWait(driver, self.element_wait_in_seconds))
+        # navigate directly: launch_browser() calls back into initialize_driver()
+        if self.web_app_url and driver:
+            driver.get(self.web_app_url)
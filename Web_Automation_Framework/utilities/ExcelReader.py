@@ -1,21 +1,288 @@
 import os
-from typing import Optional, List, Dict
+import atexit
+import shutil
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Iterator, Tuple, Union
+from collections.abc import Mapping
 import logging
 from utilities.Utilities import Utilities
 from openpyxl import *
 from openpyxl.worksheet.worksheet import Worksheet
 from collections import OrderedDict
+from itertools import islice
 from openpyxl.cell.cell import Cell as openpyxl_Cell
-from io import BytesIO
-from azure.storage.blob import BlobServiceClient
+from utilities.BlobCache import get_blob_cache
 from openpyxl.utils import get_column_letter
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from utilities.TestDataStore import file_sha256, get_store, sidecar_dir_for, update_sidecars
+from utilities.TestDataBackends import get_backend
 
 
+class WorkbookCache:
+    """
+    Process-wide LRU cache of parsed workbooks.
+
+    Entries are keyed on the absolute path plus the file's mtime and size, so a
+    workbook that changes on disk is re-parsed on the next lookup. The memory
+    budget is an estimate: openpyxl keeps roughly `expansion_factor` times the
+    xlsx size in memory for a fully loaded workbook.
+
+    A fully loaded workbook is shared by every caller. A read-only workbook streams
+    from one zip handle and is not thread-safe, so each thread (the steps, the
+    TestDataPrefetcher pool) gets its own. Callers must not modify a returned
+    workbook; writes go through ExcelWriteBuffer.
+    """
+
+    def __init__(self, memory_budget_bytes: int = 512 * 1024 * 1024, expansion_factor: int = 20):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.expansion_factor = expansion_factor
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._used_bytes = 0
+        self._lock = threading.RLock()
+
+    def _key(self, excel_file_path: str, read_only: bool, data_only: bool) -> tuple:
+        path = os.path.abspath(excel_file_path)
+        stat = os.stat(path)
+        thread = threading.get_ident() if read_only else None
+        return path, stat.st_mtime_ns, stat.st_size, read_only, data_only, thread
+
+    def get(self, excel_file_path: str, read_only: bool = False, data_only: bool = False):
+        """
+        Return the cached workbook for excel_file_path, loading it on a miss.
+        """
+        key = self._key(excel_file_path, read_only, data_only)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+            # a changed file leaves stale entries for the same path behind
+            self._drop(lambda k: k[0] == key[0] and k[1:3] != key[1:3])
+
+            workbook = load_workbook(key[0], read_only=read_only, data_only=data_only)
+            # read-only workbooks stream from the archive and stay close to the file size
+            cost = key[2] if read_only else key[2] * self.expansion_factor
+            self._entries[key] = (workbook, cost)
+            self._used_bytes += cost
+            self._evict()
+            return workbook
+
+    def invalidate(self, excel_file_path: str) -> None:
+        """
+        Forget every cached workbook loaded from excel_file_path.
+        """
+        path = os.path.abspath(excel_file_path)
+        with self._lock:
+            self._drop(lambda k: k[0] == path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._drop(lambda k: True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "used_bytes": self._used_bytes,
+                "memory_budget_bytes": self.memory_budget_bytes,
+            }
+
+    def _evict(self) -> None:
+        # always keep the most recently loaded workbook, even if it alone exceeds the budget
+        while self._used_bytes > self.memory_budget_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def _drop(self, predicate) -> None:
+        for key in [k for k in self._entries if predicate(k)]:
+            self._remove(key)
+
+    def _remove(self, key: tuple) -> None:
+        workbook, cost = self._entries.pop(key)
+        self._used_bytes -= cost
+        try:
+            # read-only workbooks hold the file handle open until closed
+            workbook.close()
+        except Exception:
+            pass
+
+
+workbook_cache = WorkbookCache()
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """
+    Hit/miss counters of the shared workbook cache.
+    """
+    return workbook_cache.stats()
+
+
+NO_MATCHING_HEADER = "No data found matching the header substring."
+
+
+class HeaderResolver:
+    """
+    Case-insensitive header substring lookup, compiled once per header row.
+    The first header containing the substring wins, as in get_data_as_string.
+    """
+
+    def __init__(self, headers: Tuple[str, ...]):
+        self.headers = headers
+        self._lowered = [header.lower() for header in headers]
+        self._memo: Dict[str, Optional[str]] = {}
+
+    def resolve(self, header_substring: str) -> Optional[str]:
+        try:
+            return self._memo[header_substring]
+        except KeyError:
+            pass
+        needle = header_substring.lower()
+        found = next((h for h, low in zip(self.headers, self._lowered) if needle in low), None)
+        self._memo[header_substring] = found
+        return found
+
+
+_header_resolvers: Dict[Tuple[str, ...], HeaderResolver] = {}
+
+
+def get_header_resolver(headers: Tuple[str, ...]) -> HeaderResolver:
+    resolver = _header_resolvers.get(headers)
+    if resolver is None:
+        resolver = _header_resolvers.setdefault(headers, HeaderResolver(headers))
+    return resolver
+
+
+class TestDataRecord(Mapping):
+    """
+    Immutable first data row of a sheet: a read-only header -> string mapping with
+    substring field lookup.
+    """
+
+    __slots__ = ("sheet_name", "_values", "_resolver")
+
+    def __init__(self, sheet_name: Union[str, int], values: Dict[str, str]):
+        object.__setattr__(self, "sheet_name", sheet_name)
+        object.__setattr__(self, "_values", dict(values))
+        object.__setattr__(self, "_resolver", get_header_resolver(tuple(values)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TestDataRecord is immutable")
+
+    def __getitem__(self, header: str) -> str:
+        return self._values[header]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return f"TestDataRecord({self.sheet_name!r}, {self._values!r})"
+
+    def field(self, header_substring: str) -> str:
+        """
+        Value of the first header containing header_substring (case-insensitive).
+        """
+        header = self._resolver.resolve(header_substring)
+        if header is None:
+            return NO_MATCHING_HEADER
+        return self._values[header]
+
 
 class ExcelReader(Utilities):
 
+    # read through the compiled SQLite sidecar (utilities/TestDataStore.py) when possible
+    use_sidecar: bool = True
+
+    def get_store(self, excel_file_path: str):
+        """
+        Return the sidecar store for an xlsx book, or None to fall back to openpyxl.
+        """
+        if not self.use_sidecar or not str(excel_file_path).lower().endswith(".xlsx"):
+            return None
+        try:
+            return get_store(excel_file_path)
+        except Exception:
+            logging.debug("Sidecar unavailable for '%s', reading workbook directly", excel_file_path, exc_info=True)
+            return None
+
+    def get_store_records(self, store, excel_file_path: str, sheet_identifier: Union[str, int],
+                          limit: Optional[int] = None) -> Optional[Iterator[Dict[str, str]]]:
+        """
+        Records of a sheet from the sidecar, or None if the sheet does not exist.
+        """
+        try:
+            sheet_name = store.resolve_sheet(sheet_identifier)
+        except (KeyError, IndexError):
+            logging.error("Sheet '%s' not found in '%s'", sheet_identifier, excel_file_path)
+            return None
+        return self.iter_records(store.iter_values(sheet_name, limit=limit), store.max_column(sheet_name))
+
+    def get_backend_records(self, backend, excel_file_path: str, sheet_identifier: Union[str, int],
+                            limit: Optional[int] = None,
+                            columns: Optional[List[str]] = None) -> Optional[Iterator[Dict[str, str]]]:
+        """
+        Records of a sheet from a CSV/JSONL/Parquet/Arrow backend, or None if the sheet
+        does not exist. Only `columns` are decoded when given.
+        """
+        try:
+            backend.sheet_file(sheet_identifier)
+        except (KeyError, IndexError):
+            logging.error("Sheet '%s' not found in '%s'", sheet_identifier, excel_file_path)
+            return None
+        return self.iter_records(backend.read_values(sheet_identifier, columns=columns, limit=limit))
+
+    def iter_data(self, excel_file_path: str, sheet_identifier: Union[str, int],
+                  limit: Optional[int] = None,
+                  columns: Optional[List[str]] = None) -> Optional[Iterator[Dict[str, str]]]:
+        """
+        Lazily iterate the data rows of a sheet by name or index: from a non-xlsx
+        backend, from the sidecar when available, or by streaming the workbook. At
+        most `limit` data rows are read, and backends only decode `columns`.
+        Returns None if the sheet cannot be found.
+        """
+        backend = get_backend(excel_file_path)
+        if backend is not None:
+            return self.get_backend_records(backend, excel_file_path, sheet_identifier, limit, columns)
+
+        store = self.get_store(excel_file_path)
+        if store is not None:
+            # the header row is read along with the data rows
+            return self.get_store_records(store, excel_file_path, sheet_identifier,
+                                          limit=None if limit is None else limit + 1)
+
+        sheet = self.get_streaming_sheet(excel_file_path, sheet_identifier)
+        if sheet is None:
+            return None
+        records = self.iter_sheet(sheet)
+        return records if limit is None else islice(records, limit)
+
     def get_data_by_name(self, excel_file_path: str, sheet_name: str) -> List[Dict[str, str]]:
 
+        backend = get_backend(excel_file_path)
+        if backend is not None:
+            records = self.get_backend_records(backend, excel_file_path, sheet_name)
+            return list(records) if records is not None else []
+
+        store = self.get_store(excel_file_path)
+        if store is not None:
+            records = self.get_store_records(store, excel_file_path, sheet_name)
+            return list(records) if records is not None else []
+
         sheet = self.get_sheet_by_name(excel_file_path, sheet_name)
         if sheet is None:
             return []
@@ -23,9 +290,18 @@ class ExcelReader(Utilities):
 
     def get_data_by_index( self, excel_file_path: str, sheet_index: int ) -> List[Dict[str, str]]:
 
-        try:
-            workbook = load_workbook(excel_file_path)
-        except Exception as e:
+        backend = get_backend(excel_file_path)
+        if backend is not None:
+            records = self.get_backend_records(backend, excel_file_path, sheet_index)
+            return list(records) if records is not None else []
+
+        store = self.get_store(excel_file_path)
+        if store is not None:
+            records = self.get_store_records(store, excel_file_path, sheet_index)
+            return list(records) if records is not None else []
+
+        workbook = self.get_work_book(excel_file_path)
+        if workbook is None:
             return []
 
         sheet = self.get_sheet_by_index(workbook, sheet_index)
@@ -36,7 +312,7 @@ class ExcelReader(Utilities):
 
     def get_work_book(self, excel_file_path: str):
         try:
-            workbook = load_workbook(excel_file_path)
+            workbook = workbook_cache.get(excel_file_path)
             return workbook
         except Exception as e:
             return None
@@ -52,7 +328,7 @@ class ExcelReader(Utilities):
         wb = None
 
         try:
-            wb = self.get_work_book(excel_file_path)
+            wb = workbook_cache.get(excel_file_path)
 
             return wb[sheet_name]
 
@@ -65,42 +341,82 @@ class ExcelReader(Utilities):
 
     def get_header_row_number(self, sheet):
 
-        max_row = sheet.max_row
-        max_col = sheet.max_column
-        for row in range(1, max_row + 1):
-            for col in range(1, max_col + 1):
-                cell_value = sheet.cell(row=row, column=col).value
-                if cell_value is not None:
-                    return row - 1
+        # single pass over cell values; the first non-empty row is the header
+        for row_idx, values in enumerate(sheet.iter_rows(values_only=True)):
+            if any(value is not None for value in values):
+                return row_idx
         return -1
 
     def read_sheet(self, sheet: Worksheet) -> List[Dict[str, str]]:
 
-        header_idx = self.get_header_row_number(sheet)
-        if header_idx < 0:
-            return []  # no header ⇒ no data
-
-        # openpyxl is 1-based
-        header_row_num = header_idx + 1
-        total_columns = sheet.max_column
-
-        # read header names
+        return list(self.iter_sheet(sheet))
+
+    def iter_sheet(self, sheet) -> Iterator[Dict[str, str]]:
+        """
+        Lazily yield each data row of `sheet` as an ordered header -> string map.
+
+        Header detection and row reading share one `iter_rows(values_only=True)`
+        pass, so a caller that only needs the first row stops after reading it.
+        Works with both regular and read-only worksheets.
+        """
+        return self.iter_records(sheet.iter_rows(values_only=True), sheet.max_column)
+
+    def iter_records(self, rows: Iterator[tuple], max_column: Optional[int] = None) -> Iterator[Dict[str, str]]:
+        """
+        Turn raw row value tuples into header -> string maps; the first non-empty
+        row is taken as the header.
+        """
+        rows = iter(rows)
+
+        header_values = None
+        for values in rows:
+            if any(value is not None for value in values):
+                header_values = values
+                break
+        if header_values is None:
+            return  # no header ⇒ no data
+
+        # read-only sheets without a dimension tag report no max_column
+        total_columns = max(max_column or 0, len(header_values))
         headers = []
         for col in range(1, total_columns + 1):
-            raw = sheet.cell(row=header_row_num, column=col).value
+            raw = header_values[col - 1] if col <= len(header_values) else None
             headers.append(str(raw) if raw is not None else f"Column{col}")
 
-        rows: List[Dict[str, str]] = []
         # data starts one row after header
-        for r in range(header_row_num + 1, sheet.max_row + 1):
+        for values in rows:
             row_map = OrderedDict()
-            for col_idx, col_name in enumerate(headers, start=1):
-                val = sheet.cell(row=r, column=col_idx).value
+            for col_idx, col_name in enumerate(headers):
+                val = values[col_idx] if col_idx < len(values) else None
                 # coerce to string so Python dict[str,str]
                 row_map[col_name] = str(val) if val is not None else ""
-            rows.append(row_map)
+            yield row_map
+
+    def get_streaming_sheet(self, excel_file_path: str, sheet_identifier: Union[str, int]):
+        """
+        Return a read-only worksheet for streaming, by sheet name or index.
+        """
+        try:
+            wb = workbook_cache.get(excel_file_path, read_only=True)
+            if isinstance(sheet_identifier, int):
+                return self.get_sheet_by_index(wb, sheet_identifier)
+            return wb[sheet_identifier]
+        except KeyError:
+            logging.error("Sheet '%s' not found in '%s'", sheet_identifier, excel_file_path)
+        except Exception:
+            logging.exception("Failed to open sheet '%s' from '%s'", sheet_identifier, excel_file_path)
+
+        return None
 
-        return rows
+    def iter_data_by_name(self, excel_file_path: str, sheet_name: str) -> Iterator[Dict[str, str]]:
+        """
+        Streaming counterpart of get_data_by_name: rows are read on demand from a
+        read-only workbook, keeping memory flat on large sheets.
+        """
+        sheet = self.get_streaming_sheet(excel_file_path, sheet_name)
+        if sheet is None:
+            return iter(())
+        return self.iter_sheet(sheet)
 
     def get_row(self, sheet, row_number: int):
 
@@ -170,63 +486,182 @@ class ExcelReader(Utilities):
     #         print(f"Error accessing cell '{cell_reference}': {e}")
     #         return None
 
+    def get_record(self, excel_file_path: str, sheet_identifier: Union[str, int]) -> TestDataRecord:
+        """
+        First data row of a sheet as an immutable TestDataRecord. Raises LookupError
+        naming the workbook and sheet if the sheet is missing or has no data rows.
+        """
+        records = self.iter_data(excel_file_path, sheet_identifier, limit=1)
+        if records is None:
+            raise LookupError(f"Sheet '{sheet_identifier}' not found in '{excel_file_path}'")
+        first_data_row = next(records, None)
+        if not first_data_row:
+            raise LookupError(f"No data rows in sheet '{sheet_identifier}' of '{excel_file_path}'")
+        return TestDataRecord(sheet_identifier, first_data_row)
+
+    def get_scenario_record(self, context, excel_file_path: str,
+                            sheet_identifier: Union[str, int]) -> TestDataRecord:
+        """
+        get_record memoised on the behave context: later steps of the same scenario
+        reuse the record without touching the workbook again. Raises LookupError
+        like get_record.
+        """
+        records = getattr(context, "test_data_records", None)
+        if records is None:
+            records = {}
+            context.test_data_records = records
+        key = (os.path.abspath(excel_file_path), sheet_identifier)
+        if key not in records:
+            # a record loaded by the suite-level prefetch is used if the book is unchanged
+            found, record = test_data_prefetcher.get(excel_file_path, sheet_identifier)
+            records[key] = record if found else self.get_record(excel_file_path, sheet_identifier)
+        return records[key]
+
+    def project_columns(self, excel_file_path: str, sheet_identifier: Union[str, int],
+                        header_substring: str) -> Optional[List[str]]:
+        """
+        For columnar backends, the single column matching header_substring so only it
+        is decoded; None (read every column) for xlsx books or when nothing matches.
+        """
+        backend = get_backend(excel_file_path)
+        if backend is None:
+            return None
+        try:
+            header = get_header_resolver(tuple(backend.headers(sheet_identifier))).resolve(header_substring)
+        except (KeyError, IndexError):
+            return None
+        return [header] if header is not None else None
+
     def get_data_as_string(self, FILE_PATH, SHEET_IDENTIFIER, HEADER_SUBSTRING):
+        """
+        Value under the first header containing HEADER_SUBSTRING in the first data row
+        of a sheet (by name or index). NO_MATCHING_HEADER when no header matches; None,
+        logged, when the sheet is missing or has no data.
+        """
+        if type(SHEET_IDENTIFIER) not in (str, int):
+            logging.error("SHEET_IDENTIFIER must be a string (sheet name) or an integer (sheet index), got %r",
+                          SHEET_IDENTIFIER)
+            return None
 
-        workbook = self.get_work_book(FILE_PATH)
-        if not workbook:
-            print(f"Error: Could not load workbook from '{FILE_PATH}'")
-        else:
-            sheet = None
-            if type(SHEET_IDENTIFIER) is str:
+        records = self.iter_data(FILE_PATH, SHEET_IDENTIFIER, limit=1,
+                                 columns=self.project_columns(FILE_PATH, SHEET_IDENTIFIER, HEADER_SUBSTRING))
+        if records is None:
+            logging.error("Sheet '%s' not found in '%s'", SHEET_IDENTIFIER, FILE_PATH)
+            return None
+
+        # only the first data row is needed, so stop streaming after it
+        first_data_row = next(records, None)
+        if not first_data_row:
+            logging.warning("No data found in sheet '%s' of '%s'", SHEET_IDENTIFIER, FILE_PATH)
+            return None
 
-                print("type of sheet is string")
-                sheet = self.get_sheet_by_name(FILE_PATH, SHEET_IDENTIFIER)
+        header = get_header_resolver(tuple(first_data_row)).resolve(HEADER_SUBSTRING)
+        if header is None:
+            return NO_MATCHING_HEADER
+        return first_data_row[header]
 
-            elif type(SHEET_IDENTIFIER) is int:
 
-                sheet = self.get_sheet_by_index(workbook, SHEET_IDENTIFIER)
+class TestDataPrefetcher:
+    """
+    Loads the test-data records a run will need on a background thread pool.
 
-            else:
-                print("Error: SHEET_IDENTIFIER must be a string (sheet name) or an integer (sheet index).")
+    Started from before_all with the sheet names found in the Examples tables of
+    every Scenario Outline, so data loading overlaps the first browser launch
+    instead of running on each step's critical path.
+    """
 
-            if not sheet:
-                print(f"Error: Sheet '{SHEET_IDENTIFIER}' not found in '{FILE_PATH}'")
-            else:
-                all_data_rows = self.read_sheet(sheet)
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self._futures: Dict[tuple, Tuple[tuple, Future]] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def collect_sheet_names(features, sheet_columns: Tuple[str, ...] = ("SheetName",)) -> List[str]:
+        """
+        Distinct values of the sheet columns across all Examples tables, in file order.
+        """
+        names: List[str] = []
+        for feature in features:
+            for scenario in feature.walk_scenarios(with_outlines=True):
+                for examples in getattr(scenario, "examples", None) or []:
+                    table = examples.table
+                    if table is None:
+                        continue
+                    for column in sheet_columns:
+                        if column not in table.headings:
+                            continue
+                        for row in table.rows:
+                            value = row[column].strip()
+                            if value and value not in names:
+                                names.append(value)
+        return names
+
+    def start(self, excel_file_path: str, sheet_identifiers) -> None:
+        """
+        Queue background loads of the first data row of each sheet. A workbook
+        that cannot be read is logged and skipped; the steps then load it themselves.
+        """
+        reader = ExcelReader()
+        path = os.path.abspath(excel_file_path)
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            logging.warning("Not prefetching test data, cannot read '%s': %s", path, e)
+            return
+        book_version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="testdata-prefetch")
+            for sheet_identifier in sheet_identifiers:
+                key = (path, sheet_identifier)
+                if key not in self._futures:
+                    future = self._executor.submit(reader.get_record, path, sheet_identifier)
+                    self._futures[key] = (book_version, future)
+        logging.info("Prefetching %d test-data sheets from '%s'", len(sheet_identifiers), path)
+
+    def get(self, excel_file_path: str, sheet_identifier: Union[str, int]) -> Tuple[bool, Optional[TestDataRecord]]:
+        """
+        (True, record) for a prefetched sheet, waiting if it is still loading;
+        (False, None) if it was not prefetched or the book has changed since.
+        Raises get_record's LookupError for a missing or empty sheet.
+        """
+        path = os.path.abspath(excel_file_path)
+        with self._lock:
+            entry = self._futures.get((path, sheet_identifier))
+        if entry is None:
+            return False, None
+        book_version, future = entry
+        try:
+            stat = os.stat(path)
+            if (stat.st_mtime_ns, stat.st_size) != book_version:
+                return False, None
+            return True, future.result()
+        except LookupError:
+            # missing sheet or no data rows: loading it again would fail the same way
+            raise
+        except Exception:
+            logging.exception("Prefetch of sheet '%s' from '%s' failed", sheet_identifier, path)
+            return False, None
 
-                if not all_data_rows:
-                    print(f"No data found in sheet '{SHEET_IDENTIFIER}'.")
-                else:
-                    first_data_row = all_data_rows[0]
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._futures.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
 
-                    found_header_key = None
-                    for header_key in first_data_row.keys():
-                        if HEADER_SUBSTRING.lower() in header_key.lower():
-                            found_header_key = header_key
-                            break
 
-                    if found_header_key:
-                        name_data = first_data_row[found_header_key]
-                        return name_data
-                    else:
-                        return "No data found matching the header substring."
+test_data_prefetcher = TestDataPrefetcher()
 
 
 def read_azure_data(excel_name: str, sheet_name: str) -> Optional[Worksheet]:
     try:
 
-        conn_str = os.getenv("APPPACKAGE")
-        if not conn_str:
-            raise RuntimeError("Missing APPPACKAGE environment variable")
-
-        client = BlobServiceClient.from_connection_string(conn_str)
-        container = client.get_container_client("moes-mobile-testdata")
-        blob = container.get_blob_client(excel_name)
-
-        stream = blob.download_blob()
-        data = stream.readall()
-
-        wb = load_workbook(filename=BytesIO(data), data_only=True)
+        # downloads are cached on disk per blob name + ETag and revalidated with a
+        # conditional request; the parsed workbook lands in the shared sheet cache
+        local_path = get_blob_cache().fetch(excel_name)
+        wb = workbook_cache.get(local_path, data_only=True)
         return wb[sheet_name]
 
     except Exception:
@@ -237,47 +672,205 @@ def read_azure_data(excel_name: str, sheet_name: str) -> Optional[Worksheet]:
         return None
 
 
+@contextmanager
+def workbook_write_lock(excel_file_path: str, timeout: float = 120.0):
+    """
+    Hold the cross-process write lock of a workbook: an immediate transaction on a
+    lock database next to its sidecar, so parallel workers' read-modify-write
+    cycles of the same book run one at a time.
+    """
+    path = os.path.abspath(excel_file_path)
+    lock_dir = sidecar_dir_for(path)
+    os.makedirs(lock_dir, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(lock_dir, f"{os.path.basename(path)}.write.lock"),
+                           timeout=timeout, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        finally:
+            conn.execute("ROLLBACK")
+    finally:
+        conn.close()
+
+
+class ExcelWriteBuffer:
+    """
+    Collects cell writes and applies them with one load/save per workbook.
+
+    Writes are coalesced per sheet and column (the last write to a cell wins), column
+    widths are grown incrementally from the written values, and each flush saves to a
+    temp file that is renamed over the workbook (keeping its file mode). The whole
+    load/modify/save runs under workbook_write_lock, so other processes writing the
+    same book neither lose their cells nor overwrite these. Pending writes are flushed explicitly
+    (once per scenario from features/environment.py), every `flush_interval` seconds
+    when set, and at interpreter exit.
+    """
+
+    def __init__(self, flush_interval: Optional[float] = None):
+        self.flush_interval = flush_interval
+        # path -> sheet -> lower-cased column -> (column name, {row: data})
+        self._pending: Dict[str, Dict[str, Dict[str, tuple]]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer = None
+        if flush_interval:
+            self._timer = threading.Thread(target=self._flush_periodically, name="excel-write-buffer", daemon=True)
+            self._timer.start()
+        atexit.register(self.close)
+
+    def write(self, sheet_path: str, sheet_name: str, col_name: str, row_num: int, data: str) -> None:
+        path = os.path.abspath(sheet_path)
+        with self._lock:
+            columns = self._pending.setdefault(path, {}).setdefault(sheet_name, {})
+            _, cells = columns.setdefault(col_name.lower(), (col_name, {}))
+            cells[row_num] = data
+
+    def pending(self) -> int:
+        """
+        Number of buffered cell writes not yet saved.
+        """
+        with self._lock:
+            return sum(
+                len(cells)
+                for sheets in self._pending.values()
+                for columns in sheets.values()
+                for _, cells in columns.values()
+            )
+
+    def flush(self, sheet_path: Optional[str] = None) -> bool:
+        """
+        Save pending writes for one workbook, or all workbooks when sheet_path is None.
+        Returns False if any write could not be applied.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if sheet_path is None:
+                    batches = self._pending
+                    self._pending = {}
+                else:
+                    path = os.path.abspath(sheet_path)
+                    batches = {path: self._pending.pop(path)} if path in self._pending else {}
+
+            ok = True
+            for path, sheets in batches.items():
+                ok = self._flush_workbook(path, sheets) and ok
+            return ok
+
+    def close(self) -> None:
+        self._stop.set()
+        self.flush()
+
+    def _flush_periodically(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logging.exception("Periodic flush of buffered cell writes failed")
+
+    def _flush_workbook(self, path: str, sheets: Dict[str, Dict[str, tuple]]) -> bool:
+        try:
+            with workbook_write_lock(path):
+                return self._apply_writes(path, sheets)
+        except sqlite3.OperationalError:
+            logging.exception("Timed out waiting for the write lock of %r", path)
+            return False
+
+    def _apply_writes(self, path: str, sheets: Dict[str, Dict[str, tuple]]) -> bool:
+        try:
+            old_sha256 = file_sha256(path)
+            wb = load_workbook(path)
+        except Exception:
+            logging.exception("Failed to open %r to flush buffered cell writes", path)
+            return False
+
+        ok = True
+        # {sheet: {(row, column): value}} actually written, for the sidecar update
+        written: Dict[str, Dict[Tuple[int, int], str]] = {}
+        for sheet_name, columns in sheets.items():
+            if sheet_name not in wb.sheetnames:
+                logging.error("Sheet '%s' not found in %r", sheet_name, path)
+                ok = False
+                continue
+            sheet = wb[sheet_name]
+
+            # 1) map header names (row 1) to column indexes once per sheet
+            header_idx = {}
+            for i, cell in enumerate(sheet[1]):
+                header_idx.setdefault(str(cell.value or "").strip().lower(), i + 1)
+
+            for col_key, (col_name, cells) in columns.items():
+                col_idx = header_idx.get(col_key)
+                if col_idx is None:
+                    logging.error("Column '%s' not found in %r [%s]", col_name, path, sheet_name)
+                    ok = False
+                    continue
+
+                # 2) set the cells (openpyxl auto-creates row/cell if needed)
+                for row_num, data in cells.items():
+                    sheet.cell(row=row_num, column=col_idx).value = data
+                    written.setdefault(sheet_name, {})[(row_num, col_idx)] = data
+
+                # 3) grow the column width from the new values; only a column that was
+                #    never sized needs a full scan
+                letter = get_column_letter(col_idx)
+                if letter in sheet.column_dimensions:
+                    max_length = max(
+                        [sheet.column_dimensions[letter].width - 2]
+                        + [len(str(data)) for data in cells.values() if data is not None]
+                    )
+                else:
+                    max_length = max(
+                        (len(str(c.value)) for c in sheet[letter] if c.value is not None),
+                        default=len(col_name)
+                    )
+                sheet.column_dimensions[letter].width = max_length + 2
+
+        # 4) save to a temp file next to the workbook and swap it in; mkstemp creates
+        #    it 0600, so it takes the workbook's mode first
+        fd, tmp_path = tempfile.mkstemp(suffix=".xlsx", dir=os.path.dirname(path))
+        os.close(fd)
+        try:
+            wb.save(tmp_path)
+            wb.close()
+            shutil.copymode(path, tmp_path)
+            # cached read-only workbooks keep the file open, and Windows cannot replace an open file
+            workbook_cache.invalidate(path)
+            os.replace(tmp_path, path)
+        except Exception:
+            logging.exception("Failed to save buffered cell writes to %r", path)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+        # 5) patch the compiled sidecars instead of leaving the next read to recompile the book
+        if written:
+            update_sidecars(path, old_sha256, file_sha256(path), written)
+        return ok
+
+
+excel_write_buffer = ExcelWriteBuffer()
+
+
 def set_cell_data(
         sheet_path: str,
         sheet_name: str,
         col_name: str,
         row_num: int,
-        data: str
+        data: str,
+        buffered: bool = False
 ) -> bool:
     """
     Write `data` into (sheet_name, col_name, row_num) of the workbook at sheet_path.
     Returns True on success, False on any failure (missing sheet/column, IO error, etc.).
+    With buffered=True the write is queued on `excel_write_buffer` and saved on its next flush.
     """
     try:
-        wb = load_workbook(sheet_path)
-        sheet = wb[sheet_name]  # KeyError if sheet_name not found
-
-        # 1) find the column index by matching header row (row 1)
-        header_row = list(sheet[1])
-        col_idx = next(
-            (i + 1 for i, cell in enumerate(header_row)
-             if str(cell.value or "").strip().lower() == col_name.lower()),
-            None
-        )
-        if col_idx is None:
-            return False
-
-        # 2) set the cell (openpyxl auto-creates row/cell if needed)
-        cell = sheet.cell(row=row_num, column=col_idx)
-        cell.value = data
-
-        # 3) auto-size the column
-        letter = get_column_letter(col_idx)
-        max_length = max(
-            (len(str(c.value)) for c in sheet[letter] if c.value is not None),
-            default=len(col_name)
-        )
-        sheet.column_dimensions[letter].width = max_length + 2
-
-        # 4) save changes
-        wb.save(sheet_path)
-        wb.close()
-        return True
+        excel_write_buffer.write(sheet_path, sheet_name, col_name, row_num, data)
+        if buffered:
+            return True
+        return excel_write_buffer.flush(sheet_path)
 
     except Exception:
         logging.exception(
@@ -292,37 +885,17 @@ def set_report_cell_data(
         sheet_name: str,
         col_name: str,
         row_num: int,
-        data: str
+        data: str,
+        buffered: bool = False
 ) -> bool:
     """
     Exactly the same as set_cell_data, but writes to report_sheet_path instead.
     """
     try:
-        wb = load_workbook(report_sheet_path)
-        sheet = wb[sheet_name]
-
-        header_row = list(sheet[1])
-        col_idx = next(
-            (i + 1 for i, cell in enumerate(header_row)
-             if str(cell.value or "").strip().lower() == col_name.lower()),
-            None
-        )
-        if col_idx is None:
-            return False
-
-        cell = sheet.cell(row=row_num, column=col_idx)
-        cell.value = data
-
-        letter = get_column_letter(col_idx)
-        max_length = max(
-            (len(str(c.value)) for c in sheet[letter] if c.value is not None),
-            default=len(col_name)
-        )
-        sheet.column_dimensions[letter].width = max_length + 2
-
-        wb.save(report_sheet_path)
-        wb.close()
-        return True
+        excel_write_buffer.write(report_sheet_path, sheet_name, col_name, row_num, data)
+        if buffered:
+            return True
+        return excel_write_buffer.flush(report_sheet_path)
 
     except Exception:
         logging.exception(
@@ -0,0 +1,139 @@
+"""
+Fill a whole form with one script call instead of a lookup and send_keys per field.
+
+fill_form(driver, {locator: value}) looks every field up in the page (with
+utilities.BatchLocator's locate), sets its value through the native value setter
+(so React/Vue-style wrappers see it) and dispatches focus, input, change and blur
+the way typing would: one round trip for the whole form. Checkboxes and radios
+take a truthy/falsy value and are clicked only when they need to change; selects
+match an option's value, then its text.
+
+Fields whose handlers need real key events opt out per field with
+RealTyping(value); those are cleared and typed into with send_keys afterwards.
+"""
+import logging
+from typing import Dict, List, Union
+
+from selenium.common.exceptions import ElementNotInteractableException, NoSuchElementException
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+from utilities.BatchLocator import LOCATE_JS, Locator
+
+# Configure module logger
+logger = logging.getLogger(__name__)
+
+
+class RealTyping:
+    """
+    Form value typed key by key with send_keys instead of being set by script.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self):
+        return f"RealTyping({self.value!r})"
+
+
+FILL_FORM_JS = LOCATE_JS + """
+const fields = arguments[0];
+const result = {missing: [], blocked: [], typed: []};
+const truthy = (value) => value === true || ['true', 'yes', 'on', '1', 'y'].includes(String(value).toLowerCase());
+const nativeSetter = (element) => {
+    const proto = element instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype
+        : element instanceof HTMLSelectElement ? HTMLSelectElement.prototype : HTMLInputElement.prototype;
+    return Object.getOwnPropertyDescriptor(proto, 'value').set;
+};
+// false when a select has no matching option; throws when the element cannot take a value
+const fill = (element, value) => {
+    if (element.type === 'checkbox' || element.type === 'radio') {
+        if (element.checked !== truthy(value)) element.click();
+        return true;
+    }
+    const editable = element instanceof HTMLInputElement || element instanceof HTMLTextAreaElement
+        || element instanceof HTMLSelectElement || element.isContentEditable;
+    if (!editable) throw new Error('not a form field: <' + element.tagName.toLowerCase() + '>');
+    element.focus();
+    if (element instanceof HTMLSelectElement) {
+        const text = String(value);
+        const option = Array.from(element.options).find(o => o.value === text)
+            || Array.from(element.options).find(o => o.text.trim() === text);
+        if (!option) return false;
+        nativeSetter(element).call(element, option.value);
+    } else if (element.isContentEditable) {
+        element.textContent = value;
+    } else {
+        nativeSetter(element).call(element, value === null ? '' : String(value));
+    }
+    element.dispatchEvent(new Event('input', {bubbles: true}));
+    element.dispatchEvent(new Event('change', {bubbles: true}));
+    element.blur();
+    return true;
+};
+fields.forEach((field, index) => {
+    let element;
+    try {
+        element = field.element || locate(field.by, field.using);
+    } catch (e) {
+        element = null;
+    }
+    if (!element) { result.missing.push(index); return; }
+    if (element.disabled || element.readOnly) { result.blocked.push([index, 'disabled or read-only']); return; }
+    if (field.type) { result.typed.push([index, element]); return; }
+    // one field failing (not editable, a throwing handler) must not stop the others
+    try {
+        if (!fill(element, field.value)) result.missing.push(index);
+    } catch (e) {
+        result.blocked.push([index, String(e && e.message || e)]);
+    }
+});
+return result;
+"""
+
+FormKey = Union[Locator, WebElement]
+
+
+def fill_form(driver: WebDriver, mapping: Dict[FormKey, object]) -> int:
+    """
+    Set every field of {(By, value) or element: value}; returns the round trips used.
+    Raises KeyError for a key that is neither, before anything is filled;
+    NoSuchElementException for fields (or select options) not found and
+    ElementNotInteractableException for disabled, read-only or non-editable ones,
+    after the other fields have been filled.
+    """
+    keys: List[FormKey] = list(mapping)
+    fields = []
+    for key in keys:
+        value = mapping[key]
+        field = {"type": isinstance(value, RealTyping),
+                 "value": None if isinstance(value, RealTyping) else value}
+        if isinstance(key, WebElement):
+            field["element"] = key
+        elif isinstance(key, tuple) and len(key) == 2:
+            field["by"], field["using"] = key
+        else:
+            raise KeyError(f"Unknown form field {key!r}: expected a (By, value) locator or a WebElement")
+        fields.append(field)
+
+    result = driver.execute_script(FILL_FORM_JS, fields)
+    round_trips = 1
+    for index, element in result["typed"]:
+        element.clear()
+        element.send_keys(str(mapping[keys[index]].value))
+        round_trips += 2
+    logger.info(f"Form filled: {len(keys) - len(result['missing']) - len(result['blocked'])} of {len(keys)} fields "
+                f"({len(result['typed'])} typed) in {round_trips} round trips")
+
+    if result["missing"]:
+        raise NoSuchElementException(f"Form fields not found: {[_describe(keys[i]) for i in result['missing']]}")
+    if result["blocked"]:
+        raise ElementNotInteractableException(
+            f"Form fields not fillable: {[f'{_describe(keys[i])} ({reason})' for i, reason in result['blocked']]}")
+    return round_trips
+
+
+def _describe(key: FormKey) -> str:
+    if isinstance(key, WebElement):
+        return f"element {key.id}"
+    return f"{key[0]}={key[1]}"
@@ -0,0 +1,262 @@
+"""
+Pooled, keep-alive connections to a Selenium grid (self-hosted or BrowserStack).
+
+webdriver.Remote opens a fresh urllib3 pool per session and closes it on quit, so
+every session pays new TCP (and TLS) handshakes to the hub. A GridClient keeps one
+pool per hub for the whole run, shared by all of its sessions, caps the sessions
+this process runs at once (queueing the rest), retries session creation with
+exponential backoff while the grid is saturated or unreachable, and records
+per-command latency. Any other failure to create a session (bad capabilities,
+credentials) is raised at once.
+"""
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+from urllib.parse import unquote, urlsplit, urlunsplit
+
+import urllib3
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException, WebDriverException
+from selenium.webdriver.remote.client_config import ClientConfig
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+# Configure module logger
+logger = logging.getLogger(__name__)
+
+
+class CommandMetrics:
+    """
+    Latency samples per WebDriver command (the last `window` of each).
+    """
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, command: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(command, deque(maxlen=self.window)).append(seconds)
+            self._counts[command] = self._counts.get(command, 0) + 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        {command: {count, mean_ms, p50_ms, p95_ms, max_ms}}
+        """
+        with self._lock:
+            samples = {command: sorted(values) for command, values in self._samples.items()}
+            counts = dict(self._counts)
+        result = {}
+        for command, values in samples.items():
+            result[command] = {
+                "count": counts[command],
+                "mean_ms": round(sum(values) / len(values) * 1000, 2),
+                "p50_ms": round(values[len(values) // 2] * 1000, 2),
+                "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))] * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2),
+            }
+        return result
+
+
+# SessionNotCreatedException messages of a grid that is full or whose queue timed out
+SATURATION_MESSAGES = (
+    "timed out", "queue", "capacity", "no available", "no free slot", "parallel", "limit reached",
+    "try again", "busy",
+)
+
+
+class SharedRemoteConnection(RemoteConnection):
+    """
+    RemoteConnection that sends through its GridClient's pool and times each command.
+    close() keeps the pool open for the next session.
+    """
+
+    def __init__(self, client_config: ClientConfig, grid: "GridClient"):
+        self._grid = grid
+        # HTTP status of the last error response, for deciding whether to retry
+        self.last_error_status: Optional[int] = None
+        super().__init__(client_config=client_config)
+
+    def _get_connection_manager(self):
+        # built by RemoteConnection once per hub, so the proxy and certificate settings apply
+        return self._grid.shared_pool(super()._get_connection_manager)
+
+    def _request(self, method, url, body=None) -> dict:
+        response = super()._request(method, url, body=body)
+        status = response.get("status")
+        self.last_error_status = status if isinstance(status, int) and status >= 400 else None
+        return response
+
+    def execute(self, command, params):
+        started = time.perf_counter()
+        try:
+            return super().execute(command, params)
+        finally:
+            self._grid.metrics.record(command, time.perf_counter() - started)
+
+    def close(self):
+        pass
+
+
+class GridClient:
+    """
+    All sessions this process opens against one hub.
+    """
+
+    def __init__(self, hub_url: str, max_sessions: int = 4, session_timeout: float = 600.0,
+                 retries: int = 5, backoff_seconds: float = 2.0, pool_size: Optional[int] = None):
+        parts = urlsplit(hub_url)
+        self.hub_url = urlunsplit((parts.scheme, parts.hostname + (f":{parts.port}" if parts.port else ""),
+                                   parts.path, parts.query, parts.fragment))
+        # credentials go in the client config instead of every request URL
+        self.username = unquote(parts.username) if parts.username else None
+        self.password = unquote(parts.password) if parts.password else None
+        self.max_sessions = max_sessions
+        self.session_timeout = session_timeout
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.metrics = CommandMetrics()
+        self.sessions_created = 0
+        self.session_retries = 0
+        self.queued_seconds = 0.0
+        self._slots = threading.BoundedSemaphore(max_sessions)
+        self._lock = threading.Lock()
+        # one connection per concurrent session, plus one for status/new-session calls
+        self._pool_args = {"maxsize": pool_size or max_sessions + 1, "block": True, "retries": False}
+        self._pool: Optional[urllib3.PoolManager] = None
+
+    def _client_config(self) -> ClientConfig:
+        return ClientConfig(remote_server_addr=self.hub_url, keep_alive=True, username=self.username,
+                            password=self.password, timeout=300,
+                            init_args_for_pool_manager={"init_args_for_pool_manager": self._pool_args})
+
+    def shared_pool(self, build: Callable[[], urllib3.PoolManager]) -> urllib3.PoolManager:
+        """
+        The pool all sessions send through, built with build() by the first one.
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = build()
+            return self._pool
+
+    def new_session(self, options) -> webdriver.Remote:
+        """
+        Open a session, waiting for a free slot first when max_sessions are running.
+        The slot is given back when the driver quits.
+        """
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.session_timeout):
+            raise SessionNotCreatedException(
+                f"No free grid slot on {self.hub_url} after {self.session_timeout:.0f}s")
+        waited = time.perf_counter() - started
+        with self._lock:
+            self.queued_seconds += waited
+        if waited > 1:
+            logger.info("Waited %.1fs for a grid slot on %s", waited, self.hub_url)
+
+        try:
+            driver = self._create_with_retry(options)
+        except BaseException:
+            self._slots.release()
+            raise
+        self._release_on_quit(driver)
+        return driver
+
+    def _create_with_retry(self, options) -> webdriver.Remote:
+        attempt = 0
+        while True:
+            connection = SharedRemoteConnection(self._client_config(), self)
+            try:
+                driver = webdriver.Remote(command_executor=connection, options=options)
+                with self._lock:
+                    self.sessions_created += 1
+                return driver
+            except (WebDriverException, urllib3.exceptions.HTTPError) as e:
+                attempt += 1
+                if not self._retryable(e, connection.last_error_status) or attempt > self.retries:
+                    raise
+                # saturated or restarting grid: back off with jitter and try again
+                delay = self.backoff_seconds * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                with self._lock:
+                    self.session_retries += 1
+                logger.warning("Session creation on %s failed (%s), retry %d/%d in %.1fs",
+                               self.hub_url, str(e).splitlines()[0] if str(e) else type(e).__name__,
+                               attempt, self.retries, delay)
+                time.sleep(delay)
+
+    @staticmethod
+    def _retryable(error: Exception, status: Optional[int]) -> bool:
+        """
+        True for a full grid (capacity or queue timeout), a hub that cannot be
+        reached and 5xx responses that are not a WebDriver error of their own.
+        """
+        if isinstance(error, urllib3.exceptions.HTTPError):
+            return True
+        if isinstance(error, SessionNotCreatedException):
+            message = (error.msg or "").lower()
+            return any(text in message for text in SATURATION_MESSAGES)
+        # W3C errors (invalid argument, ...) get their own exception type even when sent as a 500
+        return type(error) is WebDriverException and status is not None and status >= 500
+
+    def _release_on_quit(self, driver: webdriver.Remote) -> None:
+        original_quit = driver.quit
+        released = threading.Event()
+
+        def quit_and_release() -> None:
+            try:
+                original_quit()
+            finally:
+                if not released.is_set():
+                    released.set()
+                    self._slots.release()
+
+        driver.quit = quit_and_release
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "hub": self.hub_url,
+                "sessions_created": self.sessions_created,
+                "session_retries": self.session_retries,
+                "queued_seconds": round(self.queued_seconds, 3),
+                "commands": self.metrics.snapshot(),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.clear()
+
+
+_grid_clients: Dict[str, GridClient] = {}
+_grid_clients_lock = threading.Lock()
+
+
+def get_grid_client(hub_url: str, max_sessions: int = 4) -> GridClient:
+    """
+    The process-wide client for a hub URL.
+    """
+    with _grid_clients_lock:
+        client = _grid_clients.get(hub_url)
+        if client is None:
+            client = GridClient(hub_url, max_sessions=max_sessions)
+            _grid_clients[hub_url] = client
+        return client
+
+
+def shutdown_grid_clients() -> None:
+    with _grid_clients_lock:
+        clients = list(_grid_clients.values())
+        _grid_clients.clear()
+    for client in clients:
+        stats = client.stats()
+        if stats["sessions_created"]:
+            logger.info("Grid %s: %d sessions, %d retries, %.1fs queued, commands %s",
+                        stats["hub"], stats["sessions_created"], stats["session_retries"],
+                        stats["queued_seconds"], stats["commands"])
+        client.close()
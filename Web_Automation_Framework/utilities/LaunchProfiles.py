@@ -0,0 +1,178 @@
+"""
+Named browser launch profiles, selected by behave userdata "launch_profile" (or the
+LaunchProfile column of the Config sheet).
+
+"default" leaves the options as get_chrome_driver / get_firefox_driver build them.
+"fast" strips what a functional test does not need: images, web fonts, extensions,
+background networking, component updates and the GPU, loads pages with the eager
+strategy (DOMContentLoaded instead of every subresource) and starts the browser
+from a copy of a pre-seeded profile directory, so first-run work is skipped.
+"""
+import atexit
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from typing import List
+
+# Configure module logger
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE = "default"
+FAST_PROFILE = "fast"
+LAUNCH_PROFILES = (DEFAULT_PROFILE, FAST_PROFILE)
+
+CHROME_FAST_ARGS = [
+    "--blink-settings=imagesEnabled=false",
+    "--disable-remote-fonts",
+    "--disable-extensions",
+    "--disable-component-extensions-with-background-pages",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-gpu",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-features=Translate,OptimizationHints,MediaRouter",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--metrics-recording-only",
+]
+
+# written into Default/Preferences of the seeded Chrome profile
+CHROME_FAST_PREFERENCES = {
+    "profile": {
+        "managed_default_content_settings": {"images": 2},
+        "default_content_setting_values": {"notifications": 2},
+        "password_manager_enabled": False,
+    },
+    "credentials_enable_service": False,
+    "browser": {"check_default_browser": False},
+    "translate": {"enabled": False},
+}
+
+FIREFOX_FAST_PREFS = {
+    # images and web fonts
+    "permissions.default.image": 2,
+    "gfx.downloadable_fonts.enabled": False,
+    "browser.display.use_document_fonts": 0,
+    # extensions and updates
+    "extensions.update.enabled": False,
+    "extensions.update.autoUpdateDefault": False,
+    "app.update.auto": False,
+    "app.update.checkInstallTime": False,
+    # background networking
+    "network.prefetch-next": False,
+    "network.dns.disablePrefetch": True,
+    "network.http.speculative-parallel-limit": 0,
+    "browser.safebrowsing.malware.enabled": False,
+    "browser.safebrowsing.phishing.enabled": False,
+    "browser.safebrowsing.downloads.enabled": False,
+    "datareporting.healthreport.uploadEnabled": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "toolkit.telemetry.enabled": False,
+    "browser.newtabpage.activity-stream.feeds.topsites": False,
+    # GPU
+    "layers.acceleration.disabled": True,
+    "gfx.webrender.software": True,
+    # first run
+    "browser.shell.checkDefaultBrowser": False,
+    "browser.startup.homepage_override.mstone": "ignore",
+    "browser.startup.page": 0,
+    "startup.homepage_welcome_url": "about:blank",
+    "dom.webnotifications.enabled": False,
+}
+
+_seed_lock = threading.Lock()
+_profile_copies: List[str] = []
+
+
+def normalize_profile(name: str) -> str:
+    """
+    Config sheet value to a profile name; blank or unknown values fall back to default.
+    """
+    name = (name or DEFAULT_PROFILE).strip().lower()
+    if name not in LAUNCH_PROFILES:
+        logger.warning("Unknown launch profile '%s', using '%s'", name, DEFAULT_PROFILE)
+        return DEFAULT_PROFILE
+    return name
+
+
+def _seed_dir(browser: str) -> str:
+    root = os.getenv("WAF_PROFILE_CACHE") or os.path.join(
+        os.path.expanduser("~"), ".cache", "web_automation_framework", "profiles")
+    return os.path.join(root, f"{browser}-{FAST_PROFILE}")
+
+
+def _write_chrome_seed(path: str) -> None:
+    os.makedirs(os.path.join(path, "Default"), exist_ok=True)
+    # the sentinel file makes Chrome skip its first-run tasks
+    open(os.path.join(path, "First Run"), "w").close()
+    with open(os.path.join(path, "Default", "Preferences"), "w", encoding="utf-8") as fh:
+        json.dump(CHROME_FAST_PREFERENCES, fh)
+
+
+def _write_firefox_seed(path: str) -> None:
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "user.js"), "w", encoding="utf-8") as fh:
+        for key, value in FIREFOX_FAST_PREFS.items():
+            fh.write(f"user_pref({json.dumps(key)}, {json.dumps(value)});\n")
+
+
+def seeded_profile_copy(browser: str) -> str:
+    """
+    A fresh temp copy of the browser's seeded profile; every session needs its own
+    directory. The seed is built once per machine, the copies are removed at exit.
+    """
+    seed = _seed_dir(browser)
+    with _seed_lock:
+        if not os.path.isdir(seed):
+            os.makedirs(os.path.dirname(seed), exist_ok=True)
+            tmp_seed = tempfile.mkdtemp(prefix=f"{os.path.basename(seed)}.", dir=os.path.dirname(seed))
+            (_write_chrome_seed if browser == "chrome" else _write_firefox_seed)(tmp_seed)
+            try:
+                os.replace(tmp_seed, seed)
+            except OSError:
+                # another worker seeded it first
+                shutil.rmtree(tmp_seed, ignore_errors=True)
+    copy = tempfile.mkdtemp(prefix=f"waf-{browser}-")
+    shutil.copytree(seed, copy, dirs_exist_ok=True)
+    with _seed_lock:
+        _profile_copies.append(copy)
+    return copy
+
+
+def apply_chrome_profile(options, profile: str) -> None:
+    """
+    Add the profile's switches to Chrome options.
+    """
+    if normalize_profile(profile) != FAST_PROFILE:
+        return
+    for argument in CHROME_FAST_ARGS:
+        options.add_argument(argument)
+    options.add_argument(f"--user-data-dir={seeded_profile_copy('chrome')}")
+    options.page_load_strategy = "eager"
+
+
+def apply_firefox_profile(options, profile: str) -> None:
+    """
+    Add the profile's preferences to Firefox options.
+    """
+    if normalize_profile(profile) != FAST_PROFILE:
+        return
+    for key, value in FIREFOX_FAST_PREFS.items():
+        options.set_preference(key, value)
+    # passed by path: options.profile would zip the directory into the new-session request
+    options.add_argument("-profile")
+    options.add_argument(seeded_profile_copy("firefox"))
+    options.page_load_strategy = "eager"
+
+
+@atexit.register
+def _remove_profile_copies() -> None:
+    with _seed_lock:
+        copies = list(_profile_copies)
+        _profile_copies.clear()
+    for path in copies:
+        shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,400 @@
+"""
+CDP network policy for Chrome sessions: block, allow and stub third-party traffic.
+
+The policy is a JSON file (see network_policy.json):
+
+    {
+      "mode": "enforce",                     # or "observe": block nothing, record sizes
+      "block": ["*google-analytics.com/*", "*doubleclick.net/*"],
+      "allow": [],
+      "stubs": [{"url": "*googletagmanager.com/gtm.js*", "status": 200,
+                 "content_type": "application/javascript", "body": ""}],
+      "features": {"Checkout": {"allow": ["*js.stripe.com/*"]}}
+    }
+
+Patterns use the CDP wildcards: `*` for any run of characters, `?` for one. The
+top-level lists apply to every feature; a feature's entry adds to them, and its
+allow list wins over any block pattern. Requests matching a block or stub pattern
+are paused with Fetch.requestPaused on a background CDP connection and then failed
+(BlockedByClient), fulfilled from the stub, or continued when allowed; all other
+traffic is never paused. When the CDP connection cannot be opened, the block list
+is applied with Network.setBlockedURLs instead, without stubs or counters.
+
+The same connection serves the record/replay cache of utilities.ReplayCache.
+
+Blocked bytes are estimates: a run in "observe" mode records the transfer size of
+every matching URL (query string stripped) to the sizes file, and enforce runs
+count those sizes for the requests they block or stub.
+"""
+import base64
+import json
+import logging
+import os
+import threading
+import uuid
+from fnmatch import fnmatchcase
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from utilities.ReplayCache import RECORD, ReplayCache
+
+# Configure module logger
+logger = logging.getLogger(__name__)
+
+ENFORCE = "enforce"
+OBSERVE = "observe"
+DEFAULT_SIZES_FILE = os.path.join("reports", "network_sizes.json")
+
+
+def _strip_query(url: str) -> str:
+    return url.split("?", 1)[0].split("#", 1)[0]
+
+
+class Stub:
+    """
+    Canned response for an endpoint.
+    """
+
+    def __init__(self, url: str, status: int = 200, content_type: str = "text/plain", body: str = "",
+                 headers: Optional[Dict[str, str]] = None):
+        self.url = url
+        self.status = status
+        self.headers = dict(headers or {})
+        self.headers.setdefault("Content-Type", content_type)
+        self.headers.setdefault("Access-Control-Allow-Origin", "*")
+        self.body = body.encode("utf-8")
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Stub":
+        return cls(data["url"], data.get("status", 200), data.get("content_type", "text/plain"),
+                   data.get("body", ""), data.get("headers"))
+
+
+class NetworkRules:
+    """
+    Block/allow/stub decisions for one feature.
+    """
+
+    def __init__(self, block: Sequence[str] = (), allow: Sequence[str] = (), stubs: Sequence[Stub] = ()):
+        self.block = list(block)
+        self.allow = list(allow)
+        self.stubs = list(stubs)
+
+    def decide(self, url: str) -> Tuple[str, Optional[Stub]]:
+        """
+        ("allow" | "stub" | "block" | "pass", stub) for a request URL.
+        """
+        if any(fnmatchcase(url, pattern) for pattern in self.allow):
+            return "allow", None
+        for stub in self.stubs:
+            if fnmatchcase(url, stub.url):
+                return "stub", stub
+        if any(fnmatchcase(url, pattern) for pattern in self.block):
+            return "block", None
+        return "pass", None
+
+
+class NetworkPolicyConfig:
+    """
+    A parsed policy file.
+    """
+
+    def __init__(self, data: dict, sizes_file: str = DEFAULT_SIZES_FILE):
+        self.mode = data.get("mode", ENFORCE)
+        self.sizes_file = data.get("sizes_file", sizes_file)
+        self._base = data
+        self._features: Dict[str, dict] = data.get("features", {})
+        self.transfer_sizes: Dict[str, int] = {}
+        try:
+            with open(self.sizes_file, "r", encoding="utf-8") as fh:
+                self.transfer_sizes = json.load(fh)
+        except (OSError, ValueError):
+            self.transfer_sizes = {}
+        self._sizes_lock = threading.Lock()
+
+    def for_feature(self, feature_name: Optional[str]) -> NetworkRules:
+        extra = self._features.get(feature_name or "", {})
+        return NetworkRules(
+            block=self._base.get("block", []) + extra.get("block", []),
+            allow=self._base.get("allow", []) + extra.get("allow", []),
+            stubs=[Stub.from_json(s) for s in self._base.get("stubs", []) + extra.get("stubs", [])],
+        )
+
+    def intercept_patterns(self) -> List[str]:
+        """
+        Every block and stub pattern of every feature: the only URLs the browser pauses.
+        """
+        patterns = []
+        for section in [self._base, *self._features.values()]:
+            patterns.extend(section.get("block", []))
+            patterns.extend(stub["url"] for stub in section.get("stubs", []))
+        return list(dict.fromkeys(patterns))
+
+    def estimated_size(self, url: str) -> int:
+        return self.transfer_sizes.get(_strip_query(url), 0)
+
+    def record_size(self, url: str, size: int) -> None:
+        with self._sizes_lock:
+            self.transfer_sizes[_strip_query(url)] = size
+
+    def save_sizes(self) -> None:
+        if self.mode != OBSERVE:
+            return
+        with self._sizes_lock:
+            sizes = dict(self.transfer_sizes)
+        os.makedirs(os.path.dirname(os.path.abspath(self.sizes_file)), exist_ok=True)
+        tmp_path = f"{self.sizes_file}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(sizes, fh, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.sizes_file)
+
+
+_configs: Dict[str, NetworkPolicyConfig] = {}
+_configs_lock = threading.Lock()
+
+
+def load_network_policy(path: str) -> NetworkPolicyConfig:
+    path = os.path.abspath(path)
+    with _configs_lock:
+        config = _configs.get(path)
+        if config is None:
+            with open(path, "r", encoding="utf-8") as fh:
+                config = NetworkPolicyConfig(json.load(fh))
+            _configs[path] = config
+        return config
+
+
+def save_network_sizes() -> None:
+    with _configs_lock:
+        configs = list(_configs.values())
+    for config in configs:
+        config.save_sizes()
+
+
+class NetworkInterceptor:
+    """
+    Applies a policy to one Chrome session for as long as the session lives.
+
+    The CDP connection runs a trio event loop on a daemon thread; every paused
+    request is answered in its own task so a slow stub never holds up the page.
+    """
+
+    def __init__(self, driver, config: NetworkPolicyConfig, replay: Optional[ReplayCache] = None):
+        self.driver = driver
+        self.config = config
+        self.replay = replay
+        self._policy_patterns = config.intercept_patterns()
+        self.rules = config.for_feature(None)
+        self.feature_name: Optional[str] = None
+        self.attached = False
+        self.fallback = False
+        self._counters = self._empty_counters()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._trio_token = None
+        self._cancel_scope = None
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _empty_counters() -> Dict[str, int]:
+        return {"blocked_requests": 0, "blocked_bytes": 0, "stubbed_requests": 0, "stubbed_bytes_saved": 0,
+                "allowed_requests": 0, "replay_hits": 0, "replay_misses": 0, "replay_recorded": 0}
+
+    def start(self, timeout: float = 10.0) -> "NetworkInterceptor":
+        if not self._policy_patterns and self.replay is None:
+            return self
+        self._thread = threading.Thread(target=self._run, name="network-policy", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        if self._ready.is_set() and self._error is None:
+            self.attached = True
+        else:
+            logger.warning("CDP interception unavailable (%s); blocking with Network.setBlockedURLs only",
+                           self._error or "timed out")
+            self.fallback = True
+            self._apply_blocked_urls()
+        return self
+
+    def _apply_blocked_urls(self) -> None:
+        if self.config.mode != ENFORCE:
+            return
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.rules.block})
+        except Exception as e:
+            logger.warning("Network.setBlockedURLs failed: %s", e)
+
+    def _run(self) -> None:
+        import trio
+        try:
+            trio.run(self._listen)
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._ready.set()
+
+    async def _listen(self) -> None:
+        import trio
+        async with self.driver.bidi_connection() as connection:
+            session, devtools = connection.session, connection.devtools
+            stages = devtools.fetch.RequestStage
+            policy_stage = stages.RESPONSE if self.config.mode == OBSERVE else stages.REQUEST
+            patterns = [devtools.fetch.RequestPattern(url_pattern=p, request_stage=policy_stage)
+                        for p in self._policy_patterns]
+            if self.replay is not None:
+                # replay: look up at the request stage; record misses at the response stage
+                replay_stages = [] if self.replay.mode == RECORD else [stages.REQUEST]
+                if not self.replay.strict:
+                    replay_stages.append(stages.RESPONSE)
+                patterns += [devtools.fetch.RequestPattern(url_pattern="*",
+                                                           resource_type=devtools.network.ResourceType(t),
+                                                           request_stage=stage)
+                             for t in self.replay.resource_types() for stage in replay_stages]
+            events = session.listen(devtools.fetch.RequestPaused, buffer_size=1000)
+            await session.execute(devtools.fetch.enable(patterns=patterns))
+            self._trio_token = trio.lowlevel.current_trio_token()
+            with trio.CancelScope() as scope:
+                self._cancel_scope = scope
+                self._ready.set()
+                async with trio.open_nursery() as nursery:
+                    async for event in events:
+                        nursery.start_soon(self._handle, session, devtools, event)
+
+    async def _handle(self, session, devtools, event) -> None:
+        try:
+            if event.response_status_code is not None or event.response_error_reason is not None:
+                await self._handle_response(session, devtools, event)
+            else:
+                await self._handle_request(session, devtools, event)
+        except Exception as e:
+            # the page navigated away or the session closed while the request was paused
+            logger.debug("Paused request %s not answered: %s", event.request.url, e)
+
+    async def _handle_request(self, session, devtools, event) -> None:
+        import trio
+        url = event.request.url
+        decision, stub = self.rules.decide(url) if self.config.mode == ENFORCE else ("pass", None)
+        if decision == "block":
+            self._count("blocked_requests", "blocked_bytes", self.config.estimated_size(url))
+            await session.execute(devtools.fetch.fail_request(
+                event.request_id, devtools.network.ErrorReason.BLOCKED_BY_CLIENT))
+            return
+        if decision == "stub":
+            self._count("stubbed_requests", "stubbed_bytes_saved",
+                        max(self.config.estimated_size(url) - len(stub.body), 0))
+            await self._fulfill(session, devtools, event, stub.status, list(stub.headers.items()), stub.body)
+            return
+        if decision == "allow":
+            self._count("allowed_requests")
+
+        key = self._replay_key(event)
+        if key is not None:
+            entry = await trio.to_thread.run_sync(self.replay.lookup, key)
+            if entry is not None:
+                self._count("replay_hits")
+                await self._fulfill(session, devtools, event, *entry)
+                return
+            self._count("replay_misses")
+            if self.replay.strict:
+                await session.execute(devtools.fetch.fail_request(
+                    event.request_id, devtools.network.ErrorReason.INTERNET_DISCONNECTED))
+                return
+        await session.execute(devtools.fetch.continue_request(event.request_id))
+
+    async def _handle_response(self, session, devtools, event) -> None:
+        import trio
+        url = event.request.url
+        status = event.response_status_code or 0
+        headers = [(h.name, h.value) for h in event.response_headers or []]
+        body = None
+        if 200 <= status < 300 and event.response_error_reason is None:
+            if self.config.mode == OBSERVE and any(fnmatchcase(url, p) for p in self._policy_patterns):
+                body = await self._response_body(session, devtools, event)
+                self.config.record_size(url, len(body))
+            key = self._replay_key(event)
+            if key is not None:
+                if body is None:
+                    body = await self._response_body(session, devtools, event)
+                await trio.to_thread.run_sync(
+                    self.replay.record, key, event.request.method, url, status, headers, body)
+                self._count("replay_recorded")
+        await session.execute(devtools.fetch.continue_request(event.request_id))
+
+    @staticmethod
+    async def _response_body(session, devtools, event) -> bytes:
+        body, is_base64 = await session.execute(devtools.fetch.get_response_body(event.request_id))
+        return base64.b64decode(body) if is_base64 else body.encode("utf-8")
+
+    @staticmethod
+    async def _fulfill(session, devtools, event, status: int, headers, body: bytes) -> None:
+        await session.execute(devtools.fetch.fulfill_request(
+            event.request_id, status,
+            response_headers=[devtools.fetch.HeaderEntry(name=name, value=value) for name, value in headers],
+            body=base64.b64encode(body).decode("ascii")))
+
+    def _replay_key(self, event) -> Optional[str]:
+        if self.replay is None:
+            return None
+        return self.replay.key_for(event.request.method, event.request.url, event.resource_type.value,
+                                   event.request.post_data)
+
+    def _count(self, requests_key: str, bytes_key: Optional[str] = None, size: int = 0) -> None:
+        with self._lock:
+            self._counters[requests_key] += 1
+            if bytes_key:
+                self._counters[bytes_key] += size
+
+    def start_scenario(self, feature_name: Optional[str]) -> None:
+        """
+        Switch to the feature's rules and reset the per-scenario counters.
+        """
+        if feature_name != self.feature_name:
+            self.feature_name = feature_name
+            self.rules = self.config.for_feature(feature_name)
+            if self.fallback:
+                self._apply_blocked_urls()
+        with self._lock:
+            self._counters = self._empty_counters()
+
+    def scenario_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def stop(self) -> None:
+        if self._trio_token is not None and self._cancel_scope is not None:
+            import trio
+            try:
+                trio.from_thread.run_sync(self._cancel_scope.cancel, trio_token=self._trio_token)
+            except (RuntimeError, trio.RunFinishedError):
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+def attach_network_policy(driver, policy_path: Optional[str],
+                          replay: Optional[ReplayCache] = None) -> Optional[NetworkInterceptor]:
+    """
+    Start enforcing the policy file and/or the replay cache on a new Chrome session;
+    None when neither is set.
+    """
+    if not policy_path and replay is None:
+        return None
+    config = load_network_policy(policy_path) if policy_path else NetworkPolicyConfig({})
+    interceptor = NetworkInterceptor(driver, config, replay).start()
+    setattr(driver, "network_policy", interceptor)
+    _stop_on_quit(driver, interceptor)
+    return interceptor
+
+
+def _stop_on_quit(driver, interceptor: NetworkInterceptor) -> None:
+    # the trio thread and the bidi connection end with the session (pool discard or after_all)
+    original_quit = driver.quit
+
+    def stop_and_quit() -> None:
+        try:
+            interceptor.stop()
+        except Exception:
+            logger.debug("Stopping network interception failed", exc_info=True)
+        original_quit()
+
+    driver.quit = stop_and_quit
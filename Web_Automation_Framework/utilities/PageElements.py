@@ -0,0 +1,208 @@
+"""
+Declarative locators for page objects, with element handles cached per page.
+
+    class LoginPage(BasePage):
+        username = Locator(By.ID, "username")
+        submit = Locator(By.CSS_SELECTOR, "button[type=submit]")
+
+The first element accessed after the page is entered resolves every locator of
+the page in one execute_script (utilities.BatchLocator) and logs the ones that
+matched nothing; later accesses return the cached handle with no lookup.
+Handles are not re-validated with a round trip. Instead, a CachedElement that
+turns out stale finds its element again and retries the command, and the whole
+cache is dropped when the driver navigates (get, back, forward, refresh) or
+switches window or frame. PageObjectManager creates the caches and clears them
+at the end of the scenario.
+"""
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+from utilities.BatchLocator import resolve_locators
+from utilities.FormFill import fill_form
+
+# Configure module logger
+logger = logging.getLogger(__name__)
+
+# commands after which no element handle of the previous context can be used
+CONTEXT_CHANGING_COMMANDS = {
+    Command.GET, Command.GO_BACK, Command.GO_FORWARD, Command.REFRESH, Command.SWITCH_TO_FRAME,
+    Command.SWITCH_TO_PARENT_FRAME, Command.SWITCH_TO_WINDOW, Command.NEW_WINDOW, Command.CLOSE,
+}
+
+
+def track_navigation(driver: WebDriver) -> None:
+    """
+    Count the context-changing commands the driver sends, in driver._waf_navigations.
+    """
+    if getattr(driver, "_waf_navigations", None) is not None:
+        return
+    driver._waf_navigations = 0
+    original_execute = driver.execute
+
+    def tracking_execute(driver_command, params=None):
+        if driver_command in CONTEXT_CHANGING_COMMANDS:
+            driver._waf_navigations += 1
+        return original_execute(driver_command, params)
+
+    driver.execute = tracking_execute
+
+
+class CachedElement(WebElement):
+    """
+    WebElement that finds itself again with its locator when it has gone stale.
+    """
+
+    def __init__(self, parent: WebDriver, id_: str, locator: Tuple[str, str], cache: "ElementCache"):
+        super().__init__(parent, id_)
+        self._locator = locator
+        self._cache = cache
+
+    def relocate(self) -> None:
+        self._id = self._parent.find_element(*self._locator).id
+        self._cache.relocations += 1
+
+    def _retry_stale(self, fn, *args):
+        try:
+            return fn(*args)
+        except StaleElementReferenceException:
+            self.relocate()
+            return fn(*args)
+
+    def _execute(self, command, params=None):
+        return self._retry_stale(super()._execute, command, params)
+
+    # these two go through execute_script rather than _execute
+    def is_displayed(self) -> bool:
+        return self._retry_stale(super().is_displayed)
+
+    def get_attribute(self, name):
+        return self._retry_stale(super().get_attribute, name)
+
+
+class ElementCache:
+    """
+    Element handles of one page instance, by locator name.
+    """
+
+    def __init__(self, driver: WebDriver, locators: Optional[Dict[str, Tuple[str, str]]] = None):
+        self.driver = driver
+        self.locators = locators or {}
+        self.hits = 0
+        self.misses = 0
+        self.relocations = 0
+        self.invalidations = 0
+        self.batch_resolutions = 0
+        self.missing: List[str] = []
+        self._elements: Dict[str, CachedElement] = {}
+        self._resolved = False
+        track_navigation(driver)
+        self._generation = driver._waf_navigations
+
+    def get(self, name: str, locator: Tuple[str, str]) -> CachedElement:
+        if self.driver._waf_navigations != self._generation:
+            self._generation = self.driver._waf_navigations
+            if self._elements:
+                self.invalidations += 1
+            self.clear()
+        element = self._elements.get(name)
+        if element is not None:
+            self.hits += 1
+            return element
+        self.misses += 1
+        if not self._resolved and len(self.locators) > 1:
+            # entering the page: look every locator up at once
+            self.resolve_all()
+            element = self._elements.get(name)
+            if element is not None:
+                return element
+        found = self.driver.find_element(*locator)
+        element = CachedElement(found.parent, found.id, locator, self)
+        self._elements[name] = element
+        return element
+
+    def resolve_all(self) -> List[str]:
+        """
+        Find every locator in one script call and cache the results; returns the
+        names of the locators that matched nothing.
+        """
+        found, self.missing = resolve_locators(self.driver, self.locators)
+        for name, element in found.items():
+            self._elements[name] = CachedElement(element.parent, element.id, self.locators[name], self)
+        self._resolved = True
+        self.batch_resolutions += 1
+        if self.missing:
+            logger.info("Locators not on the page yet: %s",
+                        {name: self.locators[name] for name in self.missing})
+        return self.missing
+
+    def clear(self) -> None:
+        self._elements.clear()
+        self._resolved = False
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "relocations": self.relocations,
+                "invalidations": self.invalidations, "batch_resolutions": self.batch_resolutions}
+
+
+class Locator:
+    """
+    Page object attribute resolving to the (cached) element for (by, value).
+    """
+
+    def __init__(self, by: str, value: str):
+        self.locator = (by, value)
+        self.name: Optional[str] = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, page, owner=None):
+        if page is None:
+            return self
+        return page.element_cache.get(self.name, self.locator)
+
+    def __repr__(self):
+        return f"Locator{self.locator}"
+
+
+class BasePage:
+    """
+    Page object with Locator attributes; locators maps each name to its (By, value).
+    """
+
+    locators: Dict[str, Tuple[str, str]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        locators = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if isinstance(value, Locator):
+                    locators[name] = value.locator
+        cls.locators = locators
+
+    def __init__(self, driver: WebDriver, element_cache: Optional[ElementCache] = None):
+        self.driver = driver
+        self.element_cache = element_cache or ElementCache(driver, self.locators)
+
+    def resolve_all(self) -> List[str]:
+        """
+        Look up all locators now (one script call); returns the missing ones.
+        """
+        return self.element_cache.resolve_all()
+
+    def fill_form(self, mapping: dict) -> int:
+        # {"input_name": "...", ...} (or locator tuples) set in one script call
+        fields = {}
+        for key, value in mapping.items():
+            if isinstance(key, str):
+                if key not in self.locators:
+                    raise KeyError(f"{type(self).__name__} has no locator named '{key}'")
+                key = self.locators[key]
+            fields[key] = value
+        return fill_form(self.driver, fields)
@@ -1,5 +1,8 @@
+from typing import Dict, List
+
 from selenium.webdriver.remote.webdriver import WebDriver
 from features.page_object.demoNocucu_page import demoNocucu_page
+from utilities.PageElements import ElementCache
 
 
 class PageObjectManager:
@@ -10,9 +13,38 @@ class PageObjectManager:
         self._sign_in_page = None
         self._welcome_page = None
         self._demoNocucu_page = None
+        self._element_caches: List[ElementCache] = []
 
+    def _element_cache(self, page_class) -> ElementCache:
+        cache = ElementCache(self.driver, page_class.locators)
+        self._element_caches.append(cache)
+        return cache
 
     def get_demoNocucu(self):
         if self._demoNocucu_page is None:
-            self._demoNocucu_page = demoNocucu_page(self.driver)
-        return self._demoNocucu_page
\ No newline at end of file
+            self._demoNocucu_page = demoNocucu_page(self.driver, self._element_cache(demoNocucu_page))
+        return self._demoNocucu_page
+
+    def invalidate(self) -> None:
+        """
+        Drop every cached element handle, e.g. after the page re-rendered itself.
+        """
+        for cache in self._element_caches:
+            cache.clear()
+
+    def element_cache_stats(self) -> Dict[str, int]:
+        totals = {"hits": 0, "misses": 0, "relocations": 0, "invalidations": 0, "batch_resolutions": 0}
+        for cache in self._element_caches:
+            for key, value in cache.stats().items():
+                totals[key] += value
+        return totals
+
+    def close(self) -> None:
+        """
+        End of scenario: forget the pages and their element handles.
+        """
+        self.invalidate()
+        self._element_caches.clear()
+        self._sign_in_page = None
+        self._welcome_page = None
+        self._demoNocucu_page = None
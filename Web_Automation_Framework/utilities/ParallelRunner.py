@@ -0,0 +1,241 @@
+"""
+Parallel behave runner.
+
+Scenarios (one per Examples row for Scenario Outlines) are planned across N workers
+longest-first from the duration history of earlier runs (see ShardScheduler). Each
+worker runs its queue as a series of behave processes, one batch of scenarios at a
+time with its own process-local driver context, and steals from the busiest worker
+once its own queue is empty. The reports are merged into reports/junit and
+reports/behave.html when all workers finish, and the history is updated from them.
+
+    python -m utilities.ParallelRunner -n 16 features
+"""
+import argparse
+import glob
+import logging
+import os
+import shutil
+import json
+import subprocess
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Sequence
+
+from behave.__main__ import run_behave
+from behave.configuration import Configuration, load_configuration
+from behave.parser import parse_file
+
+from utilities.ShardScheduler import (DEFAULT_HISTORY_FILE, DurationHistory, ScenarioItem, WorkStealingQueue,
+                                      junit_classname, plan_lpt)
+
+# Configure module logger
+logger = logging.getLogger(__name__)
+
+REPORTS_DIR = "reports"
+WORKERS_DIR = os.path.join(REPORTS_DIR, "parallel")
+
+
+def collect_scenarios(paths: Sequence[str]) -> List[ScenarioItem]:
+    """
+    Every runnable scenario under the given feature paths.
+    """
+    feature_files: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            feature_files.extend(sorted(glob.glob(os.path.join(path, "**", "*.feature"), recursive=True)))
+        else:
+            feature_files.append(path)
+
+    items = []
+    for feature_file in feature_files:
+        feature = parse_file(feature_file)
+        if feature is None:
+            continue
+        classname = junit_classname(feature)
+        for scenario in feature.walk_scenarios():
+            items.append(ScenarioItem(
+                f"{os.path.abspath(scenario.location.filename)}:{scenario.location.line}",
+                f"{classname}::{scenario.name}",
+            ))
+    return items
+
+
+def batch_dir(worker_id: int, batch: int) -> str:
+    return os.path.join(WORKERS_DIR, f"worker-{worker_id}", f"batch-{batch:03d}")
+
+
+def start_batch(worker_id: int, batch: int, locations: Sequence[str], extra_args: Sequence[str]) -> subprocess.Popen:
+    """
+    Launch one behave process on a batch; reports go to reports/parallel/worker-N/batch-M.
+    """
+    out_dir = batch_dir(worker_id, batch)
+    os.makedirs(out_dir, exist_ok=True)
+    locations_file = os.path.join(out_dir, "locations.txt")
+    with open(locations_file, "w", encoding="utf-8") as fh:
+        fh.write("\n".join(locations) + "\n")
+
+    cmd = [
+        sys.executable, "-m", "utilities.ParallelRunner", "--batch", f"@{locations_file}",
+        "--no-color", "--no-skipped",
+        "-f", "pretty", "-o", os.path.join(out_dir, "behave.html"),
+        "--junit", "--junit-directory", os.path.join(out_dir, "junit"),
+        *extra_args,
+    ]
+    log = open(os.path.join(out_dir, "console.log"), "w", encoding="utf-8")
+    try:
+        return subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT)
+    finally:
+        log.close()
+
+
+def run_batch(behave_args: Sequence[str]) -> int:
+    """
+    behave for one worker batch. behave adds the format/outfiles of behave.ini to
+    the ones on the command line, so every batch would also write
+    reports/behave.html; here they are dropped and only the batch's own apply.
+    """
+    defaults = dict(Configuration.defaults)
+    load_configuration(defaults)
+    defaults.pop("format", None)
+    defaults.pop("outfiles", None)
+    return run_behave(Configuration(list(behave_args), load_config=False, **defaults))
+
+
+def merge_junit(batch_dirs: Sequence[str], target_dir: str) -> List[str]:
+    """
+    Merge the per-batch TESTS-*.xml files into one file per feature; returns the
+    paths written.
+    """
+    suites: Dict[str, List[ET.Element]] = {}
+    for out_dir in batch_dirs:
+        for path in sorted(glob.glob(os.path.join(out_dir, "junit", "TESTS-*.xml"))):
+            suites.setdefault(os.path.basename(path), []).append(ET.parse(path).getroot())
+
+    os.makedirs(target_dir, exist_ok=True)
+    written = []
+    for name, parts in suites.items():
+        merged = ET.Element("testsuite", dict(parts[0].attrib))
+        totals = {"tests": 0, "errors": 0, "failures": 0, "skipped": 0}
+        total_time = 0.0
+        for part in parts:
+            for key in totals:
+                totals[key] += int(part.get(key, 0))
+            total_time += float(part.get("time", 0))
+            merged.extend(list(part))
+        for key, value in totals.items():
+            merged.set(key, str(value))
+        merged.set("time", str(round(total_time, 6)))
+        path = os.path.join(target_dir, name)
+        ET.ElementTree(merged).write(path, encoding="UTF-8", xml_declaration=True)
+        written.append(path)
+    return written
+
+
+def merge_pretty(batch_dirs: Sequence[str], target: str) -> None:
+    with open(target, "w", encoding="utf-8") as out:
+        for out_dir in batch_dirs:
+            path = os.path.join(out_dir, "behave.html")
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as fh:
+                    out.write(fh.read())
+                out.write("\n")
+
+
+class Worker(threading.Thread):
+    """
+    Runs batches from the shared queue until it is drained, one behave process at a time.
+    """
+
+    def __init__(self, worker_id: int, queue: WorkStealingQueue, batch_seconds: float, extra_args: Sequence[str]):
+        super().__init__(name=f"worker-{worker_id}", daemon=True)
+        self.worker_id = worker_id
+        self.queue = queue
+        self.batch_seconds = batch_seconds
+        self.extra_args = extra_args
+        self.batch_dirs: List[str] = []
+        self.exit_codes: List[int] = []
+        self.busy_seconds = 0.0
+
+    def run(self) -> None:
+        while True:
+            batch = self.queue.next_batch(self.worker_id, self.batch_seconds)
+            if not batch:
+                return
+            started = time.perf_counter()
+            process = start_batch(self.worker_id, len(self.batch_dirs), [item.location for item in batch],
+                                  self.extra_args)
+            self.batch_dirs.append(batch_dir(self.worker_id, len(self.batch_dirs)))
+            self.exit_codes.append(process.wait())
+            self.busy_seconds += time.perf_counter() - started
+
+
+def run_scheduled(items: Sequence[ScenarioItem], workers: int, history: DurationHistory,
+                  batch_seconds: float, extra_args: Sequence[str]) -> int:
+    """
+    Run every scenario on `workers` workers, merge the reports and update the history.
+    Returns the worst behave exit code.
+    """
+    queues, predicted = plan_lpt(items, workers, history)
+    queue = WorkStealingQueue(queues, history)
+    shutil.rmtree(WORKERS_DIR, ignore_errors=True)
+
+    started = time.perf_counter()
+    pool = [Worker(i, queue, batch_seconds, extra_args) for i in range(workers)]
+    for worker in pool:
+        worker.start()
+    for worker in pool:
+        worker.join()
+    actual = time.perf_counter() - started
+
+    batch_dirs = [path for worker in pool for path in worker.batch_dirs]
+    junit_dir = os.path.join(REPORTS_DIR, "junit")
+    junit_files = merge_junit(batch_dirs, junit_dir)
+    merge_pretty(batch_dirs, os.path.join(REPORTS_DIR, "behave.html"))
+    history.update_from_junit(junit_files)
+    history.save()
+
+    schedule = {
+        "scenarios": len(items),
+        "workers": workers,
+        "predicted_makespan_seconds": round(predicted, 3),
+        "actual_makespan_seconds": round(actual, 3),
+        "steals": queue.steals,
+        "worker_busy_seconds": [round(worker.busy_seconds, 3) for worker in pool],
+        "worker_batches": [len(worker.batch_dirs) for worker in pool],
+    }
+    with open(os.path.join(WORKERS_DIR, "schedule.json"), "w", encoding="utf-8") as fh:
+        json.dump(schedule, fh, indent=2)
+    logger.info("Makespan: predicted %.1fs, actual %.1fs (%d steals)", predicted, actual, queue.steals)
+    return max((code for worker in pool for code in worker.exit_codes), default=0)
+
+
+def main(argv: Sequence[str] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv[:1] == ["--batch"]:
+        return run_batch(argv[1:])
+    parser = argparse.ArgumentParser(description="Run the behave suite across parallel worker processes.")
+    parser.add_argument("paths", nargs="*", default=["features"])
+    parser.add_argument("-n", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-seconds", type=float, default=120.0,
+                        help="predicted run time of the scenarios handed to one behave process")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_FILE,
+                        help="scenario duration history, updated after every run")
+    parser.add_argument("behave_args", nargs=argparse.REMAINDER,
+                        help="arguments after -- are passed to every behave worker")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s:%(message)s")
+
+    extra_args = [arg for arg in args.behave_args if arg != "--"]
+    items = collect_scenarios(args.paths)
+    if not items:
+        logger.warning("No scenarios found under %s", args.paths)
+        return 0
+    workers = max(1, min(args.workers, len(items)))
+    logger.info("Running %d scenarios on %d workers", len(items), workers)
+    return run_scheduled(items, workers, DurationHistory(args.history), args.batch_seconds, extra_args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
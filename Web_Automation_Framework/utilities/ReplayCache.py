@@ -0,0 +1,221 @@
+"""
+Record/replay store for browser traffic, served through the CDP interception layer
+of utilities.NetworkPolicy.
+
+Response bodies are stored content-addressed (objects/<sha256>) and indexed in
+SQLite by a request key built from the matching rules (replay_rules.json):
+
+    {
+      "static_types": ["Stylesheet", "Script", "Image", "Font"],
+      "api": false,                               # also replay XHR/Fetch responses
+      "api_types": ["XHR", "Fetch"],
+      "include": ["*"],                           # URL wildcards eligible for replay
+      "exclude": ["*/api/cart*"],
+      "ignore_query_params": ["_", "cb", "v"],    # dropped from the key
+      "match_body": true,                         # POST bodies are part of the key
+      "strict": false                             # replay: fail misses instead of fetching
+    }
+
+Modes: "record" fetches everything from the network and (re)records it;
+"replay" serves recorded responses and fetches and records misses, or fails them
+when strict, which makes reruns network-free.
+"""
+import atexit
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from fnmatch import fnmatchcase
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Configure module logger
+logger = logging.getLogger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+REPLAY_MODES = (RECORD, REPLAY)
+DEFAULT_STORE_DIR = ".replay_cache"
+
+DEFAULT_RULES = {
+    "static_types": ["Stylesheet", "Script", "Image", "Font"],
+    "api": False,
+    "api_types": ["XHR", "Fetch"],
+    "include": ["*"],
+    "exclude": [],
+    "ignore_query_params": [],
+    "match_body": True,
+    "strict": False,
+}
+
+# the stored body is already decoded, and the browser recomputes the length
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+
+class ReplayCache:
+    """
+    On-disk response store shared by every worker on the machine.
+    """
+
+    def __init__(self, mode: str, rules: Optional[dict] = None, store_dir: str = DEFAULT_STORE_DIR):
+        if mode not in REPLAY_MODES:
+            raise ValueError(f"Unknown replay mode '{mode}', expected one of {REPLAY_MODES}")
+        self.mode = mode
+        self.rules = dict(DEFAULT_RULES, **(rules or {}))
+        self.store_dir = store_dir
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self.bytes_served = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(store_dir, "objects"), exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(store_dir, "index.sqlite"), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                method TEXT,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                sha256 TEXT,
+                size INTEGER,
+                recorded_at REAL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @property
+    def strict(self) -> bool:
+        return self.mode == REPLAY and bool(self.rules["strict"])
+
+    def resource_types(self) -> List[str]:
+        types = list(self.rules["static_types"])
+        if self.rules["api"]:
+            types += [t for t in self.rules["api_types"] if t not in types]
+        return types
+
+    def normalize_url(self, url: str) -> str:
+        parts = urlsplit(url)
+        ignored = set(self.rules["ignore_query_params"])
+        query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in ignored)
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+    def key_for(self, method: str, url: str, resource_type: str, post_data: Optional[str] = None) -> Optional[str]:
+        """
+        Request key under the matching rules; None when the request is not replayable.
+        """
+        if resource_type not in self.resource_types():
+            return None
+        if method not in ("GET", "POST") or (method == "POST" and resource_type in self.rules["static_types"]):
+            return None
+        if not any(fnmatchcase(url, pattern) for pattern in self.rules["include"]):
+            return None
+        if any(fnmatchcase(url, pattern) for pattern in self.rules["exclude"]):
+            return None
+        key = f"{method} {self.normalize_url(url)}"
+        if method == "POST" and self.rules["match_body"]:
+            key += " " + hashlib.sha256((post_data or "").encode("utf-8")).hexdigest()
+        return key
+
+    def _object_path(self, sha256: str) -> str:
+        return os.path.join(self.store_dir, "objects", sha256[:2], sha256)
+
+    def lookup(self, key: str) -> Optional[Tuple[int, List[Tuple[str, str]], bytes]]:
+        """
+        (status, headers, body) of a recorded response, counting the hit or miss.
+        """
+        if self.mode == RECORD:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT status, headers, sha256 FROM entries WHERE key = ?", (key,)).fetchone()
+        entry = None
+        if row is not None:
+            try:
+                with open(self._object_path(row[2]), "rb") as fh:
+                    entry = (row[0], [tuple(h) for h in json.loads(row[1])], fh.read())
+            except OSError:
+                entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.bytes_served += len(entry[2])
+        return entry
+
+    def record(self, key: str, method: str, url: str, status: int, headers: List[Tuple[str, str]],
+               body: bytes) -> None:
+        if not 200 <= status < 300:
+            return
+        sha256 = hashlib.sha256(body).hexdigest()
+        object_path = self._object_path(sha256)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            tmp_path = f"{object_path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "wb") as fh:
+                fh.write(body)
+            os.replace(tmp_path, object_path)
+        kept = [(name, value) for name, value in headers if name.lower() not in DROPPED_HEADERS]
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, method, url, status, json.dumps(kept), sha256, len(body), time.time()),
+            )
+            self._conn.commit()
+            self.recorded += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "mode": self.mode,
+                "hits": self.hits,
+                "misses": self.misses,
+                "recorded": self.recorded,
+                "bytes_served": self.bytes_served,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def report(self, path: Optional[str] = None) -> None:
+        stats = self.stats()
+        if not (stats["hits"] or stats["misses"] or stats["recorded"]):
+            return
+        logger.info("Replay cache (%s): %d hits, %d misses (hit ratio %.1f%%), %d recorded, %d bytes served",
+                    stats["mode"], stats["hits"], stats["misses"], stats["hit_ratio"] * 100, stats["recorded"],
+                    stats["bytes_served"])
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump(stats, fh, indent=2)
+
+
+_replay_caches: Dict[Tuple[str, Optional[str], str], ReplayCache] = {}
+_replay_caches_lock = threading.Lock()
+
+
+def get_replay_cache(mode: Optional[str], rules_path: Optional[str] = None,
+                     store_dir: str = DEFAULT_STORE_DIR) -> Optional[ReplayCache]:
+    """
+    Process-wide cache for a mode and rules file; None when replay is off.
+    """
+    if not mode or mode.lower() == "off":
+        return None
+    key = (mode.lower(), rules_path, os.path.abspath(store_dir))
+    with _replay_caches_lock:
+        cache = _replay_caches.get(key)
+        if cache is None:
+            rules = None
+            if rules_path:
+                with open(rules_path, "r", encoding="utf-8") as fh:
+                    rules = json.load(fh)
+            cache = ReplayCache(mode.lower(), rules, store_dir)
+            _replay_caches[key] = cache
+            atexit.register(cache.report, os.path.join("reports", "replay_cache.json"))
+        return cache
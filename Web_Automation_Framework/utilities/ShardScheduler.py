@@ -0,0 +1,190 @@
+"""
+Duration-aware scheduling of behave scenarios across parallel workers.
+
+DurationHistory keeps an exponentially decayed average run time and the last
+status of every scenario, fed from the JUnit files of each run. plan_lpt assigns
+scenarios longest-processing-time-first (previously failed scenarios ahead of
+everything else) and WorkStealingQueue hands the plan out in batches, letting an
+idle worker take work from the tail of the busiest worker's queue.
+"""
+import json
+import logging
+import os
+import threading
+import uuid
+import xml.etree.ElementTree as ET
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# Configure module logger
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_FILE = os.path.join("reports", "scenario_durations.json")
+FAILED_STATUSES = ("failed", "error", "hook_error", "undefined")
+
+
+class ScenarioItem(NamedTuple):
+    location: str  # absolute `file:line`, as passed to behave
+    key: str  # "<junit classname>::<scenario name>", matches the JUnit testcase
+
+
+class DurationHistory:
+    """
+    Per-scenario run time, decayed so that recent runs weigh the most:
+
+        duration = alpha * latest + (1 - alpha) * duration
+    """
+
+    def __init__(self, path: str = DEFAULT_HISTORY_FILE, alpha: float = 0.5,
+                 default_seconds: float = 60.0):
+        self.path = path
+        self.alpha = alpha
+        self.default_seconds = default_seconds
+        self.entries: Dict[str, dict] = {}
+        self._mean: Optional[float] = None
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                self.entries = json.load(fh)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def estimate(self, key: str) -> float:
+        """
+        Predicted seconds for a scenario; unseen ones get the mean of known scenarios.
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            return entry["duration"]
+        if self._mean is None:
+            durations = [e["duration"] for e in self.entries.values()]
+            self._mean = sum(durations) / len(durations) if durations else self.default_seconds
+        return self._mean
+
+    def failed_last_run(self, key: str) -> bool:
+        entry = self.entries.get(key)
+        return entry is not None and entry["status"] in FAILED_STATUSES
+
+    def record(self, key: str, seconds: float, status: str) -> None:
+        self._mean = None
+        entry = self.entries.get(key)
+        if entry is None:
+            self.entries[key] = {"duration": seconds, "status": status, "runs": 1}
+            return
+        entry["duration"] = self.alpha * seconds + (1 - self.alpha) * entry["duration"]
+        entry["status"] = status
+        entry["runs"] += 1
+
+    def update_from_junit(self, paths: Sequence[str]) -> int:
+        """
+        Fold the testcases of the given TESTS-*.xml files (this run's, not whatever
+        else is left in reports/junit) into the history. Skipped scenarios are
+        ignored. Returns the number of testcases recorded.
+        """
+        recorded = 0
+        for path in paths:
+            for case in ET.parse(path).getroot().iter("testcase"):
+                status = case.get("status", "")
+                if status in ("skipped", "untested"):
+                    continue
+                self.record(f"{case.get('classname')}::{case.get('name')}", float(case.get("time", 0)), status)
+                recorded += 1
+        return recorded
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(self.entries, fh, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def plan_lpt(items: Sequence[ScenarioItem], workers: int,
+             history: DurationHistory) -> Tuple[List[List[ScenarioItem]], float]:
+    """
+    Longest-processing-time-first assignment: each scenario, previously failed ones
+    first and then longest first, goes to the worker with the least predicted load.
+    Returns the per-worker queues and the predicted makespan in seconds.
+    """
+    ordered = sorted(items, key=lambda item: (not history.failed_last_run(item.key), -history.estimate(item.key)))
+    queues: List[List[ScenarioItem]] = [[] for _ in range(workers)]
+    loads = [0.0] * workers
+    for item in ordered:
+        target = loads.index(min(loads))
+        queues[target].append(item)
+        loads[target] += history.estimate(item.key)
+    return queues, max(loads, default=0.0)
+
+
+class WorkStealingQueue:
+    """
+    Per-worker deques of scenarios. A worker takes batches from the head of its own
+    deque; once it is empty it steals from the tail (the shortest scenarios) of the
+    deque with the most predicted work left.
+    """
+
+    def __init__(self, queues: Sequence[Sequence[ScenarioItem]], history: DurationHistory):
+        self.history = history
+        self.steals = 0
+        self._deques: List[Deque[ScenarioItem]] = [deque(queue) for queue in queues]
+        self._lock = threading.Lock()
+
+    def _remaining(self, worker_id: int) -> float:
+        return sum(self.history.estimate(item.key) for item in self._deques[worker_id])
+
+    def next_batch(self, worker_id: int, max_seconds: float) -> List[ScenarioItem]:
+        """
+        Up to `max_seconds` of predicted work (at least one scenario); empty when
+        every deque is drained.
+        """
+        with self._lock:
+            own = self._deques[worker_id]
+            if own:
+                return self._take(own, max_seconds, from_tail=False)
+
+            victim = max(range(len(self._deques)), key=self._remaining)
+            if not self._deques[victim]:
+                return []
+            # take at most half of the victim's remaining work
+            budget = min(max_seconds, self._remaining(victim) / 2)
+            batch = self._take(self._deques[victim], budget, from_tail=True)
+            self.steals += 1
+            logger.debug("Worker %d stole %d scenarios from worker %d", worker_id, len(batch), victim)
+            return batch
+
+    def _take(self, source: Deque[ScenarioItem], budget: float, from_tail: bool) -> List[ScenarioItem]:
+        pop = source.pop if from_tail else source.popleft
+        batch = [pop()]
+        spent = self.history.estimate(batch[0].key)
+        while source:
+            nxt = source[-1] if from_tail else source[0]
+            cost = self.history.estimate(nxt.key)
+            if spent + cost > budget:
+                break
+            batch.append(pop())
+            spent += cost
+        return batch
+
+
+def features_base_dir(feature_file: str) -> Optional[str]:
+    """
+    Directory behave uses as base_dir for a feature file: the nearest parent
+    holding a steps/ directory.
+    """
+    path = os.path.dirname(os.path.abspath(feature_file))
+    while True:
+        if os.path.isdir(os.path.join(path, "steps")):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def junit_classname(feature) -> str:
+    """
+    `<feature file relative to base_dir, dotted>.<feature name>`, as behave's JUnit reporter writes it.
+    """
+    base_dir = features_base_dir(feature.filename) or os.getcwd()
+    filename = os.path.relpath(os.path.abspath(feature.filename), base_dir).rsplit(".", 1)[0]
+    filename = filename.replace("\\", "/").replace("/", ".")
+    return f"{filename}.{feature.name or filename}"
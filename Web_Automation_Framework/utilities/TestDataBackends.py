@@ -0,0 +1,205 @@
+import csv
+import json
+import os
+from abc import ABC, abstractmethod
+from itertools import islice
+from typing import Iterator, List, Optional, Sequence, Union
+
+# file extension -> backend name, for books exported out of xlsx
+BACKEND_EXTENSIONS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Parquet/Arrow test data requires the pyarrow package: pip install pyarrow") from e
+
+
+class TestDataBackend(ABC):
+    """
+    A test-data book in a non-xlsx format.
+
+    A book is either a single file holding one sheet (named after the file stem) or
+    a directory holding one file per sheet, ordered by name. read_values yields the
+    header row first and then the data rows, like `iter_rows(values_only=True)`.
+    """
+
+    extensions: Sequence[str] = ()
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        if os.path.isdir(self.path):
+            files = sorted(
+                name for name in os.listdir(self.path)
+                if os.path.splitext(name)[1].lower() in self.extensions
+            )
+            self._sheet_files = {os.path.splitext(name)[0]: os.path.join(self.path, name) for name in files}
+        else:
+            self._sheet_files = {os.path.splitext(os.path.basename(self.path))[0]: self.path}
+
+    def sheet_names(self) -> List[str]:
+        return list(self._sheet_files)
+
+    def sheet_file(self, sheet_identifier: Union[str, int]) -> str:
+        """
+        File of a sheet by name or index; KeyError/IndexError if missing.
+        """
+        if isinstance(sheet_identifier, int):
+            return list(self._sheet_files.values())[sheet_identifier]
+        return self._sheet_files[sheet_identifier]
+
+    @abstractmethod
+    def headers(self, sheet_identifier: Union[str, int]) -> List[str]:
+        """
+        Header row of a sheet.
+        """
+
+    @abstractmethod
+    def read_values(self, sheet_identifier: Union[str, int], columns: Optional[Sequence[str]] = None,
+                    limit: Optional[int] = None) -> Iterator[tuple]:
+        """
+        Header row then up to `limit` data rows, restricted to `columns` when given.
+        """
+
+    def _projection(self, headers: List[str], columns: Optional[Sequence[str]]) -> List[int]:
+        if columns is None:
+            return list(range(len(headers)))
+        return [headers.index(column) for column in columns if column in headers]
+
+
+class CsvBackend(TestDataBackend):
+    extensions = (".csv",)
+
+    def headers(self, sheet_identifier: Union[str, int]) -> List[str]:
+        with open(self.sheet_file(sheet_identifier), newline="", encoding="utf-8-sig") as fh:
+            return next(csv.reader(fh), [])
+
+    def read_values(self, sheet_identifier, columns=None, limit=None):
+        with open(self.sheet_file(sheet_identifier), newline="", encoding="utf-8-sig") as fh:
+            reader = csv.reader(fh)
+            headers = next(reader, None)
+            if headers is None:
+                return
+            picked = self._projection(headers, columns)
+            yield tuple(headers[i] for i in picked)
+            for row in islice(reader, limit):
+                yield tuple(row[i] if i < len(row) else None for i in picked)
+
+
+class JsonLinesBackend(TestDataBackend):
+    """
+    One JSON object per line; the first object's keys are the header.
+    """
+
+    extensions = (".jsonl", ".ndjson")
+
+    def _objects(self, sheet_identifier) -> Iterator[dict]:
+        with open(self.sheet_file(sheet_identifier), encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+
+    def headers(self, sheet_identifier: Union[str, int]) -> List[str]:
+        first = next(self._objects(sheet_identifier), None)
+        return list(first) if first else []
+
+    def read_values(self, sheet_identifier, columns=None, limit=None):
+        objects = self._objects(sheet_identifier)
+        first = next(objects, None)
+        if first is None:
+            return
+        headers = list(first)
+        picked = [headers[i] for i in self._projection(headers, columns)]
+        yield tuple(picked)
+        if limit == 0:
+            return
+        yield tuple(first.get(key) for key in picked)
+        for obj in islice(objects, None if limit is None else limit - 1):
+            yield tuple(obj.get(key) for key in picked)
+
+
+class ParquetBackend(TestDataBackend):
+    """
+    Columnar files: only the requested columns are decoded, and a row limit stops
+    after the first record batch.
+    """
+
+    extensions = (".parquet",)
+
+    def headers(self, sheet_identifier: Union[str, int]) -> List[str]:
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(self.sheet_file(sheet_identifier)).names)
+
+    def read_values(self, sheet_identifier, columns=None, limit=None):
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        headers = self.headers(sheet_identifier)
+        picked = [headers[i] for i in self._projection(headers, columns)]
+        yield tuple(picked)
+        parquet_file = pq.ParquetFile(self.sheet_file(sheet_identifier))
+        remaining = limit
+        for batch in parquet_file.iter_batches(batch_size=limit or 65536, columns=picked):
+            for row in zip(*(column.to_pylist() for column in batch.columns)):
+                if remaining is not None:
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                yield row
+
+
+class ArrowBackend(TestDataBackend):
+    """
+    Arrow IPC / Feather files, read with column projection (memory-mapped).
+    """
+
+    extensions = (".arrow", ".feather")
+
+    def headers(self, sheet_identifier: Union[str, int]) -> List[str]:
+        _require_pyarrow()
+        import pyarrow.feather as feather
+        return list(feather.read_table(self.sheet_file(sheet_identifier), columns=[], memory_map=True).schema.names)
+
+    def read_values(self, sheet_identifier, columns=None, limit=None):
+        _require_pyarrow()
+        import pyarrow.feather as feather
+        headers = self.headers(sheet_identifier)
+        picked = [headers[i] for i in self._projection(headers, columns)]
+        yield tuple(picked)
+        table = feather.read_table(self.sheet_file(sheet_identifier), columns=picked, memory_map=True)
+        if limit is not None:
+            table = table.slice(0, limit)
+        for row in zip(*(column.to_pylist() for column in table.columns)):
+            yield row
+
+
+BACKENDS = {
+    "csv": CsvBackend,
+    "jsonl": JsonLinesBackend,
+    "parquet": ParquetBackend,
+    "arrow": ArrowBackend,
+}
+
+
+def get_backend(path: str) -> Optional[TestDataBackend]:
+    """
+    Backend for a test-data path by file extension, or by the files inside a
+    directory. None means the path is an xlsx book handled by openpyxl.
+    """
+    path = str(path)
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            kind = BACKEND_EXTENSIONS.get(os.path.splitext(name)[1].lower())
+            if kind:
+                return BACKENDS[kind](path)
+        return None
+    kind = BACKEND_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    return BACKENDS[kind](path) if kind else None
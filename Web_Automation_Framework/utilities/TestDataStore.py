@@ -0,0 +1,399 @@
+import datetime
+import glob
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import uuid
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from openpyxl import load_workbook
+
+# Configure module logger
+logger = logging.getLogger(__name__)
+
+SIDECAR_DIR = ".testdata_index"
+SCHEMA_VERSION = "2"
+
+# cell types JSON has no literal for, stored as {"$type": name, "value": isoformat}
+_TEMPORAL_TYPES = {
+    "datetime": datetime.datetime,
+    "date": datetime.date,
+    "time": datetime.time,
+}
+
+
+def encode_cells(values: tuple) -> str:
+    """
+    JSON text for a row of openpyxl cell values.
+    """
+    cells = []
+    for value in values:
+        # datetime before date: it is a subclass
+        name = next((name for name, kind in _TEMPORAL_TYPES.items() if isinstance(value, kind)), None)
+        if name is not None:
+            cells.append({"$type": name, "value": value.isoformat()})
+        elif isinstance(value, datetime.timedelta):
+            cells.append({"$type": "timedelta", "value": value.total_seconds()})
+        elif value is None or isinstance(value, (str, int, float, bool)):
+            cells.append(value)
+        else:
+            # array/data-table formulas and the like: keep their text
+            cells.append(str(getattr(value, "text", value)))
+    return json.dumps(cells)
+
+
+def decode_cells(text: str) -> tuple:
+    cells = []
+    for value in json.loads(text):
+        if isinstance(value, dict):
+            if value["$type"] == "timedelta":
+                value = datetime.timedelta(seconds=value["value"])
+            else:
+                value = _TEMPORAL_TYPES[value["$type"]].fromisoformat(value["value"])
+        cells.append(value)
+    return tuple(cells)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TestDataStore:
+    """
+    Read-only SQLite sidecar compiled from an xlsx test-data book.
+
+    The sidecar holds every sheet's header row number, header values and the raw
+    cell values of each row, as JSON, keyed by its Excel row number. Sidecar files are named
+    after the xlsx content hash, so a changed book compiles into a new file while
+    other workers keep reading the old one, and parallel workers share one copy.
+    """
+
+    def __init__(self, sidecar_path: str, source_path: str):
+        self.sidecar_path = sidecar_path
+        self.source_path = source_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(f"file:{sidecar_path}?mode=ro", uri=True, check_same_thread=False)
+        meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        self.source_sha256 = meta["source_sha256"]
+        self.source_stat = (int(meta["source_mtime_ns"]), int(meta["source_size"]))
+        self._sheets: Dict[str, Tuple[int, int, int]] = {}
+        self._indexes: Dict[tuple, Dict[object, Dict[str, object]]] = {}
+        self._sheet_names: List[str] = []
+        for sheet_index, name, header_row, max_column in self._conn.execute(
+                "SELECT sheet_index, name, header_row, max_column FROM sheets ORDER BY sheet_index"):
+            self._sheets[name] = (sheet_index, header_row, max_column)
+            self._sheet_names.append(name)
+
+    def sheet_names(self) -> List[str]:
+        return list(self._sheet_names)
+
+    def resolve_sheet(self, sheet_identifier: Union[str, int]) -> str:
+        """
+        Map a sheet name or index to its name; KeyError/IndexError if missing.
+        """
+        if isinstance(sheet_identifier, int):
+            return self._sheet_names[sheet_identifier]
+        if sheet_identifier not in self._sheets:
+            raise KeyError(sheet_identifier)
+        return sheet_identifier
+
+    def header_row(self, sheet_name: str) -> int:
+        """
+        1-based row number of the first non-empty row, 0 if the sheet is empty.
+        """
+        return self._sheets[sheet_name][1]
+
+    def max_column(self, sheet_name: str) -> int:
+        return self._sheets[sheet_name][2]
+
+    def iter_values(self, sheet_name: str, min_row: Optional[int] = None,
+                    limit: Optional[int] = None) -> Iterator[tuple]:
+        """
+        Yield raw row value tuples like `iter_rows(values_only=True)`, starting at
+        min_row (default: the header row) and stopping after `limit` rows.
+        """
+        sheet_index, header_row, _ = self._sheets[sheet_name]
+        if min_row is None:
+            min_row = max(header_row, 1)
+        query = "SELECT cells FROM rows WHERE sheet_index = ? AND row_num >= ? ORDER BY row_num"
+        params: tuple = (sheet_index, min_row)
+        if limit is not None:
+            query += " LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        for (cells,) in rows:
+            yield decode_cells(cells)
+
+    def row_index(self, sheet_name: str, key_columns: Tuple[str, ...]) -> Dict[object, Dict[str, object]]:
+        """
+        Map of key -> row dict for a sheet whose header is its first row, built once per
+        sidecar and reused by every later lookup with the same key columns.
+        """
+        memo_key = (sheet_name, tuple(key_columns))
+        with self._lock:
+            index = self._indexes.get(memo_key)
+        if index is None:
+            index = build_row_index(self.iter_values(sheet_name, min_row=1), key_columns)
+            with self._lock:
+                self._indexes[memo_key] = index
+        return index
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def build_row_index(rows: Iterator[tuple], key_columns: Tuple[str, ...]) -> Dict[object, Dict[str, object]]:
+    """
+    Index data rows by the value of one key column, or by a tuple of values for a
+    composite key. The first row wins when a key repeats; rows with an empty key are
+    skipped. Raises KeyError naming the first key column missing from the header.
+    """
+    rows = iter(rows)
+    headers = list(next(rows, ()))
+    for column in key_columns:
+        if column not in headers:
+            raise KeyError(column)
+    key_idx = [headers.index(column) for column in key_columns]
+
+    index: Dict[object, Dict[str, object]] = {}
+    for row in rows:
+        row = tuple(row) + (None,) * (len(headers) - len(row))
+        key = tuple(row[i] for i in key_idx)
+        if all(value is None for value in key):
+            continue
+        if len(key) == 1:
+            key = key[0]
+        if key not in index:
+            index[key] = {headers[i]: row[i] for i in range(len(headers))}
+    return index
+
+
+def sidecar_dir_for(excel_file_path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(excel_file_path)), SIDECAR_DIR)
+
+
+def sidecar_path_for(excel_file_path: str, sha256: str, data_only: bool) -> str:
+    mode = "values" if data_only else "formulas"
+    name = f"{os.path.basename(excel_file_path)}.{sha256[:16]}.{mode}.v{SCHEMA_VERSION}.sqlite"
+    return os.path.join(sidecar_dir_for(excel_file_path), name)
+
+
+def compile_workbook(excel_file_path: str, data_only: bool = False, sha256: Optional[str] = None) -> str:
+    """
+    Compile an xlsx book into its sidecar and return the sidecar path.
+
+    The sidecar is written to a temp file and renamed into place, so concurrent
+    compiles of the same book are safe; the temp file is removed if the compile fails.
+    """
+    source = os.path.abspath(excel_file_path)
+    stat = os.stat(source)
+    sha256 = sha256 or file_sha256(source)
+    target = sidecar_path_for(source, sha256, data_only)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = f"{target}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+
+    wb = load_workbook(source, read_only=True, data_only=data_only)
+    try:
+        _write_sidecar(tmp_path, wb, sha256, stat, data_only)
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    finally:
+        wb.close()
+
+    logger.info("Compiled test data sidecar %s", target)
+    return target
+
+
+def _write_sidecar(tmp_path: str, wb, sha256: str, stat: os.stat_result, data_only: bool) -> None:
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(
+            """
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE sheets (
+                sheet_index INTEGER PRIMARY KEY,
+                name TEXT UNIQUE,
+                header_row INTEGER,
+                max_column INTEGER
+            );
+            CREATE TABLE rows (
+                sheet_index INTEGER,
+                row_num INTEGER,
+                cells TEXT,
+                PRIMARY KEY (sheet_index, row_num)
+            ) WITHOUT ROWID;
+            """
+        )
+        for sheet_index, ws in enumerate(wb.worksheets):
+            header_row = 0
+            max_column = ws.max_column or 0
+            batch = []
+            for row_num, values in enumerate(ws.iter_rows(values_only=True), start=1):
+                if not header_row and any(value is not None for value in values):
+                    header_row = row_num
+                max_column = max(max_column, len(values))
+                batch.append((sheet_index, row_num, encode_cells(values)))
+                if len(batch) >= 1000:
+                    conn.executemany("INSERT INTO rows VALUES (?, ?, ?)", batch)
+                    batch = []
+            if batch:
+                conn.executemany("INSERT INTO rows VALUES (?, ?, ?)", batch)
+            conn.execute("INSERT INTO sheets VALUES (?, ?, ?, ?)", (sheet_index, ws.title, header_row, max_column))
+        conn.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [
+                ("schema_version", SCHEMA_VERSION),
+                ("source_sha256", sha256),
+                ("source_mtime_ns", str(stat.st_mtime_ns)),
+                ("source_size", str(stat.st_size)),
+                ("data_only", str(data_only)),
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+_stores: Dict[Tuple[str, bool], TestDataStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(excel_file_path: str, data_only: bool = False) -> TestDataStore:
+    """
+    Return the up-to-date sidecar store for an xlsx book, compiling it on demand.
+
+    A store is reused while the book's mtime and size are unchanged; otherwise the
+    book is re-hashed and the matching sidecar opened, or compiled if none exists.
+    Write-backs through ExcelWriteBuffer derive the new sidecar themselves
+    (update_sidecars), so only edits made outside the framework cost a compile.
+    """
+    source = os.path.abspath(excel_file_path)
+    stat = os.stat(source)
+    current_stat = (stat.st_mtime_ns, stat.st_size)
+    key = (source, data_only)
+
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is not None and store.source_stat == current_stat:
+            return store
+
+        sha256 = file_sha256(source)
+        if store is not None and store.source_sha256 == sha256:
+            # touched but unchanged content: keep the open sidecar
+            store.source_stat = current_stat
+            return store
+
+        sidecar = sidecar_path_for(source, sha256, data_only)
+        if not os.path.exists(sidecar):
+            compile_workbook(source, data_only=data_only, sha256=sha256)
+        try:
+            new_store = TestDataStore(sidecar, source)
+        except sqlite3.OperationalError:
+            # removed as stale by a worker still on an older version of the book
+            compile_workbook(source, data_only=data_only, sha256=sha256)
+            new_store = TestDataStore(sidecar, source)
+
+        if store is not None:
+            store.close()
+        store = new_store
+        store.source_stat = current_stat
+        _stores[key] = store
+        _remove_stale_sidecars(source, data_only, keep=sidecar)
+        return store
+
+
+def update_sidecars(excel_file_path: str, old_sha256: str, new_sha256: str,
+                    cells: Dict[str, Dict[Tuple[int, int], object]]) -> None:
+    """
+    After a write-back that changed only `cells` ({sheet: {(row, column): value}},
+    1-based), derive the sidecars of the new book from those of the old one, so
+    get_store finds them instead of compiling the whole book again. Called with the
+    book's write lock held; a sidecar that cannot be derived is compiled on demand.
+    """
+    source = os.path.abspath(excel_file_path)
+    stat = os.stat(source)
+    for data_only in (False, True):
+        old = sidecar_path_for(source, old_sha256, data_only)
+        new = sidecar_path_for(source, new_sha256, data_only)
+        if not os.path.exists(old) or os.path.exists(new):
+            continue
+        tmp_path = f"{new}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        try:
+            shutil.copyfile(old, tmp_path)
+            _patch_sidecar(tmp_path, new_sha256, stat, cells)
+            os.replace(tmp_path, new)
+        except Exception:
+            logger.warning("Could not update sidecar %s, it is recompiled when next read", new, exc_info=True)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def _patch_sidecar(path: str, sha256: str, stat: os.stat_result,
+                   cells: Dict[str, Dict[Tuple[int, int], object]]) -> None:
+    conn = sqlite3.connect(path)
+    try:
+        for sheet_name, sheet_cells in cells.items():
+            found = conn.execute(
+                "SELECT sheet_index, header_row, max_column FROM sheets WHERE name = ?", (sheet_name,)).fetchone()
+            if found is None:
+                raise KeyError(sheet_name)
+            sheet_index, header_row, max_column = found
+            rows: Dict[int, Dict[int, object]] = {}
+            for (row_num, column), value in sheet_cells.items():
+                rows.setdefault(row_num, {})[column] = value
+            for row_num, values in rows.items():
+                existing = conn.execute("SELECT cells FROM rows WHERE sheet_index = ? AND row_num = ?",
+                                        (sheet_index, row_num)).fetchone()
+                row = list(decode_cells(existing[0])) if existing else []
+                width = max(len(row), max(values))
+                row += [None] * (width - len(row))
+                for column, value in values.items():
+                    row[column - 1] = value
+                max_column = max(max_column, width)
+                if any(value is not None for value in row) and (not header_row or row_num < header_row):
+                    header_row = row_num
+                conn.execute("INSERT OR REPLACE INTO rows VALUES (?, ?, ?)",
+                             (sheet_index, row_num, encode_cells(tuple(row))))
+            conn.execute("UPDATE sheets SET header_row = ?, max_column = ? WHERE sheet_index = ?",
+                         (header_row, max_column, sheet_index))
+        conn.executemany(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+            [
+                ("source_sha256", sha256),
+                ("source_mtime_ns", str(stat.st_mtime_ns)),
+                ("source_size", str(stat.st_size)),
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _remove_stale_sidecars(source: str, data_only: bool, keep: str) -> None:
+    mode = "values" if data_only else "formulas"
+    pattern = os.path.join(sidecar_dir_for(source), f"{glob.escape(os.path.basename(source))}.*.{mode}*.sqlite")
+    for path in glob.glob(pattern):
+        if os.path.abspath(path) == os.path.abspath(keep):
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            # still open in another worker (Windows), removed on a later run
+            pass
@@ -7,6 +7,10 @@ import uuid
 from datetime import datetime
 from typing import Union, Tuple, List
 from utilities.DriverEngine import DriverEngine
+from utilities.TestDataBackends import BACKENDS
+from utilities.WaitEngine import get_wait_engine
+from utilities.CompoundActions import AUTO, JS, action_metrics, compound_click
+from utilities.FormFill import fill_form
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.common.by import By
@@ -52,41 +56,54 @@ class Utilities(DriverEngine):
     def wait_for_page_load(self, driver: WebDriver, url_substring: str, timeout: int = DEFAULT_TIMEOUT) -> None:
         WebDriverWait(driver, timeout).until(EC.url_contains(url_substring))
 
+    def settle(self, driver: WebDriver, element: Union[WebElement, None], legacy_seconds: float, helper: str,
+               check_covered: bool = True) -> float:
+        # readiness wait replacing a fixed sleep (timeout scaled to it); legacy wait mode still sleeps
+        return get_wait_engine(self.wait_mode).settle(driver, element, legacy_seconds, helper,
+                                                      check_covered=check_covered)
+
     def tap_element(self, driver: WebDriver, element: WebElement, click_method: str = "click", obj: str = "",
                     timeout: int = DEFAULT_TIMEOUT) -> None:
-        self.wait_visibility_of_element(driver, element, timeout)
-        driver.execute_script("arguments[0].scrollIntoView(true);", element)
-        clicked = False
-        if click_method == "jsClick":
-            self.js_click(driver, element)
-            clicked = True
-        elif click_method == "click":
-            element.click()
-            clicked = True
-        elif click_method == "actionClick":
-            self.action_click(driver, element)
-            clicked = True
-        if clicked:
-            logger.info(f"{obj}: Element clicked successfully")
-        else:
-            logger.error(f"{obj}: Element not clicked")
+        with action_metrics.measure(driver, "tap_element"):
+            if self.compound_actions and click_method in ("click", "jsClick"):
+                # scroll, checks and click in one script; native only where a trusted event is needed
+                how = compound_click(driver, element, timeout, mode=JS if click_method == "jsClick" else AUTO)
+                logger.info(f"{obj}: Element clicked successfully ({how} click)")
+                return
+            self.wait_visibility_of_element(driver, element, timeout)
+            driver.execute_script("arguments[0].scrollIntoView(true);", element)
+            clicked = False
+            if click_method == "jsClick":
+                self.js_click(driver, element)
+                clicked = True
+            elif click_method == "click":
+                element.click()
+                clicked = True
+            elif click_method == "actionClick":
+                self.action_click(driver, element)
+                clicked = True
+            if clicked:
+                logger.info(f"{obj}: Element clicked successfully")
+            else:
+                logger.error(f"{obj}: Element not clicked")
 
     def tap_element_simple(self, driver: WebDriver, element: WebElement, timeout: int = DEFAULT_TIMEOUT) -> None:
         self.wait_visibility_of_element(driver, element, timeout)
         driver.execute_script("arguments[0].scrollIntoView(true);", element)
-        time.sleep(2)
+        self.settle(driver, element, 2, "tap_element_simple")
         for _ in range(3):
             try:
                 element.click()
                 logger.info("Element has been tapped")
                 break
             except ElementClickInterceptedException:
-                time.sleep(0.5)
+                # the overlay that intercepted the click may never go away: don't wait on it
+                self.settle(driver, element, 0.5, "tap_element_simple retry", check_covered=False)
             except StaleElementReferenceException:
                 driver.refresh()
             except ElementNotInteractableException:
                 self.js_click(driver, element)
-                time.sleep(0.5)
+                self.settle(driver, None, 0.5, "tap_element_simple js_click")
                 break
             except Exception as e:
                 logger.error(f"Element tap failed: {e}")
@@ -103,22 +120,26 @@ class Utilities(DriverEngine):
         logger.info("Action backspace performed successfully")
 
     def handle_click(self, driver: WebDriver, element: WebElement, timeout: int = DEFAULT_TIMEOUT) -> None:
-        try:
-            self.wait_element_to_be_clickable(driver, element, timeout)
-        except Exception:
-            self.wait_visibility_of_element(driver, element, timeout)
-        driver.execute_script("arguments[0].scrollIntoView(true);", element)
-        try:
-            element.click()
-        except Exception:
-            if element.is_displayed():
-                self.js_click(driver, element)
-            else:
-                logger.error("Element tapping failed")
+        with action_metrics.measure(driver, "handle_click"):
+            try:
+                if self.compound_actions:
+                    compound_click(driver, element, timeout, require_enabled=True)
+                    return
+                try:
+                    self.wait_element_to_be_clickable(driver, element, timeout)
+                except Exception:
+                    self.wait_visibility_of_element(driver, element, timeout)
+                driver.execute_script("arguments[0].scrollIntoView(true);", element)
+                element.click()
+            except Exception:
+                if element.is_displayed():
+                    self.js_click(driver, element)
+                else:
+                    logger.error("Element tapping failed")
 
     def enter_input(self, driver: WebDriver, element: WebElement, input_text: str) -> None:
-        time.sleep(1)
         try:
+            self.settle(driver, element, 1, "enter_input")
             self.wait_visibility_of_element(driver, element)
             element.clear()
             element.send_keys(input_text)
@@ -143,6 +164,11 @@ class Utilities(DriverEngine):
     def get_element(self, driver: WebDriver, locator: Tuple[str, str]) -> WebElement:
         return driver.find_element(*locator)
 
+    def fill_form(self, driver: WebDriver, mapping: dict) -> None:
+        # {(By, value) or element: value} in one script; wrap a value in RealTyping to send keystrokes
+        with action_metrics.measure(driver, "fill_form"):
+            fill_form(driver, mapping)
+
     def enter_text(self, driver: WebDriver, element: WebElement, value: str, ele_name: str) -> None:
         self.wait_visibility_of_element(driver, element)
         driver.execute_script("arguments[0].scrollIntoView(true);", element)
@@ -347,6 +373,11 @@ class Utilities(DriverEngine):
             else:
                 raise ValueError(f"Unknown brand for NONPROD test data: {brand}")
 
+        # 3) Exported books (csv/jsonl/parquet/arrow): same name with the format's
+        #    extension, a directory holding one file per sheet
+        if data_type in BACKENDS:
+            fname = f"{os.path.splitext(fname)[0]}.{data_type}"
+
         return os.path.join(folder, fname)
 
     def create_report_excel(self, brand: str, browser_name: str, output_dir: str = "ExcelReport") -> None:
@@ -442,9 +473,15 @@ class Utilities(DriverEngine):
     def is_valid_email(self, email: str) -> bool:
         return bool(re.match(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$", email))
 
-    def wait_for(ms: int) -> None:
-
-        time.sleep(ms / 1000.0)
+    def wait_for(self, ms: int) -> None:
+        """
+        Wait until the page is idle, at most ms (legacy wait mode: sleep ms).
+        """
+        driver = self.get_driver()
+        if driver is None:
+            time.sleep(ms / 1000.0)
+            return
+        get_wait_engine(self.wait_mode).settle(driver, None, ms / 1000.0, "wait_for", timeout=ms / 1000.0)
 
     def lotz_confirm_page_navigation(self) -> None:
 
@@ -484,7 +521,7 @@ class Utilities(DriverEngine):
         self.wait_for(2000)
         WebDriverWait(driver, 10).until(EC.visibility_of(element))
         driver.execute_script("arguments[0].scrollIntoView(true);", element)
-        self.wait_for(2000)
+        self.settle(driver, element, 2, "assert_button_enabled")
         assert element.is_enabled(), f"Button not enabled: '{element.text}'"
         print(f"Button enabled: '{element.text}'")
 
@@ -495,7 +532,7 @@ class Utilities(DriverEngine):
         driver = self.get_driver()
         WebDriverWait(driver, 10).until(EC.visibility_of(element))
         driver.execute_script("arguments[0].scrollIntoView(true);", element)
-        self.wait_for(2000)
+        self.settle(driver, element, 2, "assert_button_disabled")
         assert not element.is_enabled(), f"Button not disabled: '{element.text}'"
         print(f"Button disabled: '{element.text}'")
 
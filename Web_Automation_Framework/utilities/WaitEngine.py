@@ -0,0 +1,206 @@
+"""
+Condition-based waits for the Utilities interaction helpers.
+
+The helpers used to sleep for a fixed time around every interaction (2s after
+scrolling, 1s before typing, 0.5s between retries). In "smart" mode a helper
+instead polls one in-page check until the element is ready: attached, visible,
+at the same position over two animation frames, no finite CSS/Web Animation
+running on it or its ancestors, and not covered at its centre. The document must
+also be idle: loaded, with no fetch/XHR (or jQuery.ajax) request in flight. A
+wait gives up after a small multiple (timeout_factor) of the sleep it replaced,
+so a 0.5s retry pause never turns into a long stall; the timeout is logged and
+the helper carries on, as it did after the fixed sleep. "legacy" mode keeps the fixed sleeps.
+
+The mode comes from DriverEngine.wait_mode (behave userdata "wait_mode", or the
+WAF_WAIT_MODE environment variable).
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+# Configure module logger
+logger = logging.getLogger(__name__)
+
+SMART = "smart"
+LEGACY = "legacy"
+WAIT_MODES = (SMART, LEGACY)
+DEFAULT_WAIT_MODE = os.getenv("WAF_WAIT_MODE", SMART)
+
+# Resolves with null when ready, otherwise with the reason it is not
+READINESS_JS = """
+const element = arguments[0], checkCovered = arguments[1];
+const done = arguments[arguments.length - 1];
+if (!window.__wafPending) {
+    // count the requests the page starts from now on
+    const pending = window.__wafPending = {count: 0};
+    if (window.fetch) {
+        const fetch = window.fetch;
+        window.fetch = function () {
+            pending.count++;
+            try {
+                return fetch.apply(this, arguments).finally(() => pending.count--);
+            } catch (e) {
+                pending.count--;
+                throw e;
+            }
+        };
+    }
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        pending.count++;
+        this.addEventListener('loadend', () => pending.count--, {once: true});
+        try {
+            return send.apply(this, arguments);
+        } catch (e) {
+            pending.count--;
+            throw e;
+        }
+    };
+}
+const documentBusy = () => {
+    if (document.readyState !== 'complete') return 'document loading';
+    if (window.__wafPending.count > 0) return 'requests pending';
+    if (window.jQuery && window.jQuery.active > 0) return 'jQuery requests pending';
+    return null;
+};
+if (!element) { done(documentBusy()); return; }
+if (!element.isConnected) { done('detached'); return; }
+const nextFrame = (callback) => {
+    // rAF does not fire in background tabs; fall back to a timer
+    let fired = false;
+    const once = () => { if (!fired) { fired = true; callback(); } };
+    requestAnimationFrame(once);
+    setTimeout(once, 100);
+};
+const animating = (node) => node.getAnimations && node.getAnimations().some(animation =>
+    animation.playState === 'running' && animation.effect
+    && animation.effect.getComputedTiming().endTime !== Infinity);
+const before = element.getBoundingClientRect();
+nextFrame(() => nextFrame(() => {
+    const rect = element.getBoundingClientRect();
+    if (rect.width === 0 || rect.height === 0) return done('not visible');
+    if (rect.x !== before.x || rect.y !== before.y || rect.width !== before.width || rect.height !== before.height) {
+        return done('moving');
+    }
+    for (let node = element; node && node.nodeType === 1; node = node.parentElement) {
+        if (animating(node)) return done('animating');
+    }
+    const x = rect.left + rect.width / 2, y = rect.top + rect.height / 2;
+    if (checkCovered && x >= 0 && y >= 0 && x < window.innerWidth && y < window.innerHeight) {
+        const root = element.getRootNode();
+        const top = (root.elementFromPoint ? root : document).elementFromPoint(x, y);
+        if (top && top !== element && !element.contains(top)) {
+            return done('covered by <' + top.tagName.toLowerCase() + (top.id ? '#' + top.id : '') + '>');
+        }
+    }
+    done(documentBusy());
+}));
+"""
+
+
+class WaitEngine:
+    """
+    Readiness waits and the time each helper spent in them.
+    """
+
+    def __init__(self, mode: str = SMART, timeout_factor: float = 3.0, min_timeout_seconds: float = 1.0,
+                 poll_seconds: float = 0.05):
+        if mode not in WAIT_MODES:
+            raise ValueError(f"Unknown wait mode '{mode}', expected one of {WAIT_MODES}")
+        self.mode = mode
+        self.timeout_factor = timeout_factor
+        self.min_timeout_seconds = min_timeout_seconds
+        self.poll_seconds = poll_seconds
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def settle(self, driver: WebDriver, element: Optional[WebElement], legacy_seconds: float, helper: str,
+               timeout: Optional[float] = None, check_covered: bool = True) -> float:
+        """
+        Wait until element (or, without one, the document) is ready to interact with;
+        in legacy mode sleep legacy_seconds instead. Returns the seconds waited.
+        timeout defaults to timeout_factor * legacy_seconds (at least
+        min_timeout_seconds); check_covered=False accepts an element under an overlay.
+        """
+        started = time.perf_counter()
+        reason = None
+        if self.mode == LEGACY:
+            time.sleep(legacy_seconds)
+        else:
+            if timeout is None:
+                timeout = max(legacy_seconds * self.timeout_factor, self.min_timeout_seconds)
+            reason = self._poll(driver, element, timeout, check_covered)
+        waited = time.perf_counter() - started
+        self._record(helper, waited, timed_out=reason is not None)
+        if reason is not None:
+            logger.warning("%s: still %s after %.2fs, continuing", helper, reason, waited)
+        else:
+            logger.info("%s waited %.2fs (%s)", helper, waited, self.mode)
+        return waited
+
+    def _poll(self, driver: WebDriver, element: Optional[WebElement], timeout: float,
+              check_covered: bool = True) -> Optional[str]:
+        """
+        None once ready, else the last reason it was not when the timeout ran out.
+        """
+        deadline = time.perf_counter() + timeout
+        while True:
+            try:
+                reason = driver.execute_async_script(READINESS_JS, element, check_covered)
+            except WebDriverException as e:
+                # stale element, closed window, no script support: leave it to the helper
+                logger.debug("Readiness check unavailable: %s", str(e).splitlines()[0] if str(e) else e)
+                return None
+            if not reason or reason == "detached":
+                return None
+            if time.perf_counter() >= deadline:
+                return reason
+            time.sleep(self.poll_seconds)
+
+    def _record(self, helper: str, waited: float, timed_out: bool) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(helper, {"calls": 0, "waited_seconds": 0.0, "timeouts": 0})
+            stats["calls"] += 1
+            stats["waited_seconds"] += waited
+            stats["timeouts"] += int(timed_out)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {helper: dict(values, waited_seconds=round(values["waited_seconds"], 3))
+                    for helper, values in self._stats.items()}
+
+
+_wait_engines: Dict[str, WaitEngine] = {}
+_wait_engines_lock = threading.Lock()
+
+
+def get_wait_engine(mode: Optional[str] = None) -> WaitEngine:
+    """
+    Process-wide engine for a wait mode (DEFAULT_WAIT_MODE when unset).
+    """
+    mode = (mode or DEFAULT_WAIT_MODE).lower()
+    with _wait_engines_lock:
+        engine = _wait_engines.get(mode)
+        if engine is None:
+            engine = WaitEngine(mode)
+            _wait_engines[mode] = engine
+        return engine
+
+
+def log_wait_stats() -> None:
+    """
+    Log the time every helper spent waiting, per wait mode.
+    """
+    with _wait_engines_lock:
+        engines = list(_wait_engines.values())
+    for engine in engines:
+        stats = engine.stats()
+        if stats:
+            total = sum(values["waited_seconds"] for values in stats.values())
+            logger.info("Waits (%s): %.1fs in total, %s", engine.mode, total, stats)